@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+외부 API 호출 지표 수집 (Anthropic / OpenAI)
+호출별 지연 시간 히스토그램, 토큰 사용량, HTTP 상태, 재시도 횟수, 실패 유형을 프로세스 내에 집계
+작업(job) 단위 요약과 전체 요약을 함께 제공
+"""
+
+import contextvars
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, float('inf'))
+RECENT_SAMPLES = 1000
+MAX_TRACKED_JOBS = 200
+
+_current_job = contextvars.ContextVar('api_metrics_job', default=None)
+
+
+def classify_failure(status_code=None, error=None):
+    """HTTP 상태/예외를 실패 유형으로 분류 (성공이면 None)"""
+    if error is not None:
+        name = type(error).__name__.lower()
+        if 'timeout' in name:
+            return 'timeout'
+        if 'connection' in name:
+            return 'connection'
+        status_code = status_code or getattr(error, 'status_code', None)
+
+    if status_code is not None and not 200 <= status_code < 300:
+        if status_code == 429:
+            return 'rate_limited'
+        if status_code in (401, 403):
+            return 'auth'
+        if status_code >= 500:
+            return 'server_error'
+        return 'client_error'
+
+    if error is not None:
+        return 'bad_response' if isinstance(error, (ValueError, KeyError)) else 'other'
+    return None
+
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latency_total = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.recent_failures = deque(maxlen=RECENT_SAMPLES)
+        self.statuses = {}
+        self.failure_types = {}
+
+    def add(self, latency, status, input_tokens, output_tokens, retries, failure):
+        self.calls += 1
+        self.retries += retries
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.latency_total += latency
+        self.recent.append(latency)
+        self.recent_failures.append(bool(failure))
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.histogram[i] += 1
+                break
+        status_key = str(status) if status is not None else 'none'
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+        if failure:
+            self.failures += 1
+            self.failure_types[failure] = self.failure_types.get(failure, 0) + 1
+
+    def summary(self):
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 3)
+
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'latency_avg': round(self.latency_total / self.calls, 3) if self.calls else None,
+            'latency_p50': percentile(0.50),
+            'latency_p95': percentile(0.95),
+            'latency_p99': percentile(0.99),
+            'latency_histogram': {
+                ('+Inf' if bound == float('inf') else f'<={bound}s'): count
+                for bound, count in zip(LATENCY_BUCKETS, self.histogram)
+            },
+            'statuses': dict(self.statuses),
+            'failure_types': dict(self.failure_types),
+        }
+
+
+class ApiMetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}             # "provider:operation" → _CallStats
+        self._jobs = OrderedDict()    # job_id → {"provider:operation" → _CallStats}
+
+    def record(self, provider, operation, latency, status=None, input_tokens=0, output_tokens=0,
+               retries=0, error=None, job_id=None):
+        """API 호출 한 번의 결과 기록"""
+        failure = classify_failure(status, error)
+        key = f"{provider}:{operation}"
+        job_id = job_id or _current_job.get()
+
+        with self._lock:
+            self._totals.setdefault(key, _CallStats()).add(
+                latency, status, input_tokens or 0, output_tokens or 0, retries, failure)
+
+            if job_id:
+                job_stats = self._jobs.get(job_id)
+                if job_stats is None:
+                    job_stats = self._jobs[job_id] = {}
+                    while len(self._jobs) > MAX_TRACKED_JOBS:
+                        self._jobs.popitem(last=False)
+                job_stats.setdefault(key, _CallStats()).add(
+                    latency, status, input_tokens or 0, output_tokens or 0, retries, failure)
+        return failure
+
+    def summary(self, job_id=None):
+        """전체 또는 작업별 요약 (job_id가 없으면 전체)"""
+        with self._lock:
+            if job_id is None:
+                stats = self._totals
+            else:
+                stats = self._jobs.get(job_id, {})
+            return {key: value.summary() for key, value in stats.items()}
+
+    def print_summary(self, job_id=None):
+        """요약을 콘솔에 출력"""
+        title = f"작업 {job_id}" if job_id else "전체"
+        print(f"📈 API 호출 통계 ({title})")
+        for key, summary in self.summary(job_id).items():
+            print(f"   • {key}: {summary['calls']}회 (실패 {summary['failures']}, 재시도 {summary['retries']}), "
+                  f"p50 {summary['latency_p50']}s / p95 {summary['latency_p95']}s, "
+                  f"토큰 {summary['input_tokens']} in / {summary['output_tokens']} out")
+            if summary['failure_types']:
+                print(f"     실패 유형: {summary['failure_types']}")
+
+    def recent_failure_rate(self, provider, operation, window=20):
+        """최근 window회 호출 중 실패 비율 (호출 기록이 없으면 None)"""
+        with self._lock:
+            stats = self._totals.get(f"{provider}:{operation}")
+            if stats is None or not stats.recent_failures:
+                return None
+            recent = list(stats.recent_failures)[-window:]
+        return sum(recent) / len(recent)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._jobs.clear()
+
+
+metrics = ApiMetricsRegistry()
+
+
+@contextmanager
+def job_context(job_id):
+    """이 블록 안에서 기록되는 API 호출을 job_id로 묶음"""
+    token = _current_job.set(job_id)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
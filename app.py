@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect
+from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, Response
 from werkzeug.utils import secure_filename
 import os
 
@@ -20,9 +20,25 @@ import srt
 from main import (
     transcribe_video, translate_title_claude, translate_subtitle_claude,
     get_title_font_for_language, get_subtitle_font_for_language,
-    render_title_text, render_subtitle_text
+    render_title_text, render_subtitle_text, extract_title_from_filename
 )
-from config import AVAILABLE_LANGUAGES
+from config import AVAILABLE_LANGUAGES, TRANSLATION_BACKEND, SPECULATIVE_ENABLED, SPECULATIVE_TARGET_LANGUAGES
+from config import WHISPER_WARMUP_MODELS, TRANSCRIPTION_WORKERS, WHISPER_BATCH_SIZE, CUE_RESEGMENT_ENABLED
+from config import PROGRESS_STREAM_MAX_SECONDS, PROGRESS_STREAM_MAX_CONNECTIONS
+from cue_resegmentation import resegment_srt_file
+from task_scheduler import CueTaskScheduler
+from transcription_worker import transcription_pool
+from transcription_router import transcription_router
+from speculative import SpeculativeCache, check_cancelled
+from api_metrics import metrics, job_context
+from job_queue import job_queue, JobWorkerPool, TERMINAL_STATES
+from progress_store import progress_store, merge_patch, FINAL_STATES
+from cancellation import cancellation_registry, OperationCancelled, raise_if_cancelled, frame_checkpoint
+from chunked_upload import ChunkedUploadStore, UploadError, UploadOffsetMismatch
+from media_store import media_store
+from audio_cache import file_content_hash
+from zip_stream import ZipStream
+from preview_proxy import preview_proxies
 # 버전 정보 (간단하게 직접 정의)
 import os
 from datetime import datetime
@@ -72,6 +88,77 @@ os.makedirs('static/temp', exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# === Whisper 모델 워밍업 (WHISPER_WARMUP_MODELS) ===
+# 음성 인식 워커 프로세스를 쓰면 워커가 시작하면서 모델을 미리 로드
+if TRANSCRIPTION_WORKERS > 0:
+    transcription_pool.start()
+elif WHISPER_WARMUP_MODELS:
+    def warmup_whisper_models():
+        from whisper_registry import model_registry
+        model_registry.warmup(WHISPER_WARMUP_MODELS)
+    
+    threading.Thread(target=warmup_whisper_models, daemon=True).start()
+
+# === 업로드 직후 추측성 사전 처리 ===
+speculative_cache = SpeculativeCache()
+
+def use_real_whisper_enabled():
+    """실제 Whisper 처리 사용 여부 (USE_REAL_WHISPER + Claude API 키)"""
+    from config import CLAUDE_API_KEY
+    use_real_whisper = os.getenv('USE_REAL_WHISPER', 'false').lower() == 'true'
+    return use_real_whisper and CLAUDE_API_KEY and CLAUDE_API_KEY != "YOUR_CLAUDE_API_KEY_HERE"
+
+def speculative_transcribe(video_path, temp_output, cancel_event=None):
+    """업로드 직후 음성 추출 + Claude 텍스트 개선"""
+    from simple_whisper import get_text_from_srt
+    from config import CLAUDE_API_KEY
+    
+    check_cancelled(cancel_event)
+    os.makedirs(temp_output, exist_ok=True)
+    srt_path = transcription_router.transcribe(video_path, temp_output, model_size='tiny')
+    check_cancelled(cancel_event)
+    return get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=CLAUDE_API_KEY)
+
+def speculative_translate_title(title, lang, source_language, cancel_event=None):
+    """파일명 기반 타이틀 미리 번역"""
+    check_cancelled(cancel_event)
+    translated = translate_title_claude(title, lang, source_language.title())
+    if translated.startswith('[번역 실패'):
+        # 실패 결과는 캐시하지 않고 본 처리에서 다시 번역
+        raise Exception(translated)
+    return translated
+
+def transcript_signature(file_info, source_language):
+    return (file_info['path'], 'tiny', source_language)
+
+def title_signature(title, lang, source_language):
+    return (title, lang, source_language)
+
+def schedule_speculative_work(session_id, uploaded_files, source_language, target_languages, transcribe=True):
+    """음성 추출/타이틀 번역을 미리 예약 (같은 설정의 작업이 이미 있으면 재사용)"""
+    if not SPECULATIVE_ENABLED:
+        return
+    
+    # 타이틀 번역은 짧으므로 음성 추출보다 먼저 예약
+    for video_index, file_info in enumerate(uploaded_files):
+        title = extract_title_from_filename(file_info['original_filename'])
+        for lang in target_languages:
+            speculative_cache.submit(
+                (session_id, 'title', video_index, lang),
+                title_signature(title, lang, source_language),
+                speculative_translate_title, title, lang, source_language
+            )
+    
+    if transcribe and use_real_whisper_enabled():
+        for video_index, file_info in enumerate(uploaded_files):
+            speculative_cache.submit(
+                (session_id, 'transcript', video_index),
+                transcript_signature(file_info, source_language),
+                speculative_transcribe, file_info['path'], os.path.join('static/temp', session_id)
+            )
+    
+    print(f"🔮 추측성 사전 처리 예약: {len(uploaded_files)}개 영상, 언어 {target_languages}")
+
 def get_video_thumbnail(video_path, output_path):
     """비디오 첫 프레임을 썸네일로 추출"""
     cap = cv2.VideoCapture(video_path)
@@ -113,12 +200,67 @@ def health():
     return jsonify({
         'status': 'healthy',
         'version': get_version_string(),
+        'translation_backend': TRANSLATION_BACKEND,
+        'transcription_queue': transcription_pool.queue_depth(),
+        'jobs': job_queue.stats(),
         'timestamp': datetime.now().isoformat()
     })
 
+# === 업로드 세션 ===
+def begin_upload_session():
+    """새 업로드 세션 생성 후 session_id 반환"""
+    previous_session_id = session.get('session_id')
+    if previous_session_id:
+        # 이전 업로드의 추측성 작업은 더 이상 필요 없음
+        speculative_cache.cancel(lambda key, signature: key[0] == previous_session_id)
+    
+    session_id = str(uuid.uuid4())
+    session['session_id'] = session_id
+    return session_id
+
+def incoming_upload_path(original_filename):
+    """저장소로 옮기기 전 임시 저장 경로"""
+    incoming_folder = os.path.join(UPLOAD_FOLDER, '_incoming')
+    os.makedirs(incoming_folder, exist_ok=True)
+    return os.path.join(incoming_folder, f"{uuid.uuid4().hex}{os.path.splitext(original_filename)[1]}")
+
+def stored_file_info(original_filename, filepath, sha256):
+    """세션에 저장할 파일 정보 (영상은 내용 해시 경로로 여러 세션이 공유)"""
+    return {
+        'filename': secure_filename(original_filename),
+        'original_filename': original_filename,
+        'size': os.path.getsize(filepath),
+        'path': filepath,
+        'sha256': sha256
+    }
+
+def finish_upload_session(session_id, uploaded_files):
+    """업로드된 파일 목록을 세션에 저장하고 추측성 작업 시작 후 응답 반환"""
+    session['uploaded_files'] = uploaded_files
+    print(f"✅ Upload completed. Total files: {len(uploaded_files)}")
+    
+    # 설정 화면에서 쓸 저해상도 미리보기를 미리 생성
+    for file_info in uploaded_files:
+        preview_proxies.schedule(file_info['path'], file_info['sha256'])
+    
+    # 음성 추출/타이틀 번역을 미리 시작 (이전에 선택한 언어가 있으면 그 언어 우선)
+    schedule_speculative_work(
+        session_id, uploaded_files,
+        source_language=session.get('source_language', 'korean'),
+        target_languages=session.get('target_languages') or SPECULATIVE_TARGET_LANGUAGES
+    )
+    
+    response = jsonify({
+        'success': True,
+        'files': uploaded_files,
+        'session_id': session_id
+    })
+    print("📤 Sending response")
+    return response
+
 @app.route('/upload', methods=['POST'])
 def upload_files():
-    """파일 업로드 처리"""
+    """파일 업로드 처리 (한 번의 요청으로 전체 파일 전송)"""
     try:
         print("📤 Upload request received")
         
@@ -130,51 +272,22 @@ def upload_files():
         print(f"📁 Processing {len(files)} files")
         
         uploaded_files = []
-        session_id = str(uuid.uuid4())
-        session['session_id'] = session_id
-        
-        session_folder = os.path.join(UPLOAD_FOLDER, session_id)
-        os.makedirs(session_folder, exist_ok=True)
-        print(f"📂 Created session folder: {session_folder}")
+        session_id = begin_upload_session()
         
         for i, file in enumerate(files):
             if file and file.filename and allowed_file(file.filename):
                 print(f"📄 Processing file {i+1}: {file.filename}")
-                filename = secure_filename(file.filename)
-                
-                # 중복 파일명 방지
-                base, ext = os.path.splitext(filename)
-                counter = 1
-                while os.path.exists(os.path.join(session_folder, filename)):
-                    filename = f"{base}_{counter}{ext}"
-                    counter += 1
-                
-                filepath = os.path.join(session_folder, filename)
-                file.save(filepath)
+                incoming_path = incoming_upload_path(file.filename)
+                file.save(incoming_path)
+                filepath, sha256 = media_store.ingest(incoming_path, file.filename)
                 print(f"💾 Saved file: {filepath}")
                 
                 # 파일 정보 저장
-                file_info = {
-                    'filename': filename,
-                    'original_filename': file.filename,
-                    'size': os.path.getsize(filepath),
-                    'path': filepath
-                }
-                uploaded_files.append(file_info)
+                uploaded_files.append(stored_file_info(file.filename, filepath, sha256))
             else:
                 print(f"❌ Skipped invalid file: {file.filename if file else 'None'}")
         
-        # 세션에 파일 정보 저장
-        session['uploaded_files'] = uploaded_files
-        print(f"✅ Upload completed. Total files: {len(uploaded_files)}")
-        
-        response = jsonify({
-            'success': True,
-            'files': uploaded_files,
-            'session_id': session_id
-        })
-        print("📤 Sending response")
-        return response
+        return finish_upload_session(session_id, uploaded_files)
         
     except Exception as e:
         print(f"❌ Upload error: {str(e)}")
@@ -182,6 +295,70 @@ def upload_files():
         traceback.print_exc()
         return jsonify({'error': f'업로드 중 오류가 발생했습니다: {str(e)}'}), 500
 
+# === 분할 업로드 (이어받기) ===
+# init으로 upload_id를 받고, 청크를 Upload-Offset 헤더와 함께 PUT, 끊기면 status의 offset부터 재전송
+chunk_uploads = ChunkedUploadStore(os.path.join(UPLOAD_FOLDER, '_partial'))
+
+@app.route('/upload/init', methods=['POST'])
+def upload_init():
+    """분할 업로드 시작"""
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename', '')
+    if not allowed_file(filename):
+        return jsonify({'error': '지원하지 않는 파일 형식입니다.'}), 400
+    try:
+        return jsonify(chunk_uploads.init(filename, int(data.get('size', 0))))
+    except (UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/upload/<upload_id>/status')
+def upload_status(upload_id):
+    """서버가 받은 바이트 수 조회 (이어서 보낼 위치)"""
+    try:
+        return jsonify(chunk_uploads.status(upload_id))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/upload/<upload_id>/chunk', methods=['PUT'])
+def upload_chunk(upload_id):
+    """청크 이어 쓰기 (본문은 파일 바이트 그대로)"""
+    try:
+        offset = int(request.headers.get('Upload-Offset', '-1'))
+        new_offset = chunk_uploads.append(upload_id, offset, request.stream, request.content_length)
+        return jsonify({'upload_id': upload_id, 'offset': new_offset})
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    except (UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/upload/complete', methods=['POST'])
+def upload_complete():
+    """다 받은 업로드들을 새 세션의 파일로 등록"""
+    upload_ids = (request.get_json(silent=True) or {}).get('upload_ids') or []
+    if not upload_ids:
+        return jsonify({'error': '파일이 선택되지 않았습니다.'}), 400
+    
+    try:
+        # 모두 다 받았는지 먼저 확인 (세션을 만든 뒤 실패하지 않도록)
+        statuses = [chunk_uploads.status(upload_id) for upload_id in upload_ids]
+        incomplete = [status['upload_id'] for status in statuses if status['offset'] != status['size']]
+        if incomplete:
+            return jsonify({'error': '아직 전송되지 않은 파일이 있습니다.', 'incomplete': incomplete}), 409
+        
+        uploaded_files = []
+        session_id = begin_upload_session()
+        for status in statuses:
+            incoming_path = incoming_upload_path(status['filename'])
+            result = chunk_uploads.complete(status['upload_id'], incoming_path)
+            # 업로드 중 계산한 해시를 그대로 저장소 키(와 음성 추출 캐시 키)로 사용
+            filepath, sha256 = media_store.ingest(incoming_path, result['filename'], sha256=result['sha256'])
+            print(f"💾 Saved file: {filepath} (sha256 {sha256[:12]})")
+            uploaded_files.append(stored_file_info(result['filename'], filepath, sha256))
+        
+        return finish_upload_session(session_id, uploaded_files)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/select_source_language')
 def select_source_language():
     """출발 언어 선택 페이지"""
@@ -203,6 +380,16 @@ def save_source_language():
     
     session['source_language'] = source_language
     print(f"🌐 Source language set to: {source_language}")
+    
+    # 출발 언어가 바뀌면 이전 설정으로 시작한 추측성 작업 취소 후 다시 예약
+    session_id = session.get('session_id')
+    if session_id:
+        speculative_cache.cancel(lambda key, signature: key[0] == session_id and signature[-1] != source_language)
+        schedule_speculative_work(
+            session_id, session.get('uploaded_files', []),
+            source_language=source_language,
+            target_languages=session.get('target_languages') or SPECULATIVE_TARGET_LANGUAGES
+        )
     return jsonify({'success': True})
 
 @app.route('/select_target_languages')
@@ -235,6 +422,18 @@ def save_target_languages():
     # 하위 호환성을 위해 기존 키도 유지
     session['selected_languages'] = target_languages
     print(f"🎯 Target languages set to: {target_languages}")
+    
+    # 선택되지 않은 언어의 타이틀 번역은 취소하고, 새로 선택된 언어는 미리 번역
+    session_id = session.get('session_id')
+    if session_id:
+        speculative_cache.cancel(lambda key, signature: key[0] == session_id and key[1] == 'title'
+                                 and key[3] not in target_languages)
+        schedule_speculative_work(
+            session_id, session.get('uploaded_files', []),
+            source_language=session.get('source_language', 'korean'),
+            target_languages=target_languages,
+            transcribe=False
+        )
     return jsonify({'success': True})
 
 # 하위 호환성을 위한 기존 라우트 유지
@@ -257,7 +456,7 @@ def save_languages():
 
 @app.route('/video_preview/<int:video_index>')
 def video_preview(video_index):
-    """비디오 파일을 스트리밍으로 제공"""
+    """비디오 파일을 스트리밍으로 제공 (미리보기 영상이 준비되었으면 그것을, 아니면 원본)"""
     if 'session_id' not in session:
         return redirect('/')
     
@@ -273,6 +472,10 @@ def video_preview(video_index):
     if not os.path.exists(video_path):
         return jsonify({'error': '비디오 파일을 찾을 수 없습니다.'}), 404
     
+    proxy_path = preview_proxies.get(video_file.get('sha256') or file_content_hash(video_path))
+    if proxy_path:
+        video_path = proxy_path
+    
     return send_from_directory(os.path.dirname(video_path), os.path.basename(video_path))
 
 @app.route('/setup_video/<int:video_index>')
@@ -301,7 +504,9 @@ def setup_video(video_index):
                          total_videos=len(uploaded_files),
                          thumbnail_url=f'/static/temp/{thumbnail_filename}',
                          selected_languages=session['selected_languages'],
-                         source_language=session['source_language'])
+                         source_language=session['source_language'],
+                         # 업로드 직후 미리 번역한 타이틀과 같은 값으로 채워 추측성 결과를 재사용
+                         default_title=extract_title_from_filename(current_file['original_filename']))
 
 @app.route('/extract_audio', methods=['POST'])
 def extract_audio():
@@ -365,7 +570,7 @@ def extract_audio():
         if use_real_whisper:
             print("🚀 Using real Whisper transcription...")
             try:
-                from simple_whisper import extract_audio_with_whisper, get_text_from_srt
+                from simple_whisper import get_text_from_srt
                 from config import CLAUDE_API_KEY
                 
                 # API 키 확인
@@ -373,10 +578,18 @@ def extract_audio():
                     print("⚠️ Claude API 키가 설정되지 않았습니다. 더미 모드로 전환합니다.")
                     use_real_whisper = False
                 else:
-                    # 실제 Whisper 처리
-                    srt_path = extract_audio_with_whisper(video_file['path'], temp_output, model_size='tiny')
-                    # Claude API로 텍스트 개선
-                    extracted_text = get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=CLAUDE_API_KEY)
+                    # 업로드 직후 시작한 추측성 결과가 있으면 재사용 (실행 중이면 완료까지 대기)
+                    extracted_text = speculative_cache.get(
+                        (session['session_id'], 'transcript', video_index),
+                        transcript_signature(video_file, session.get('source_language', 'korean'))
+                    )
+                    if extracted_text is not None:
+                        print("🔮 Using speculative transcription result")
+                    else:
+                        # 실제 Whisper 처리
+                        srt_path = transcription_router.transcribe(video_file['path'], temp_output, model_size='tiny')
+                        # Claude API로 텍스트 개선
+                        extracted_text = get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=CLAUDE_API_KEY)
                     
                     print(f"✅ Real transcription completed: {len(extracted_text)} characters")
                 
@@ -623,17 +836,21 @@ def start_processing():
     with open(session_file, 'w', encoding='utf-8') as f:
         json.dump(session_data, f, ensure_ascii=False, indent=2)
     
-    def process_in_background():
-        try:
-            process_all_videos(session_id)
-        except Exception as e:
-            print(f"처리 중 오류: {e}")
-    
-    thread = threading.Thread(target=process_in_background)
-    thread.daemon = True
-    thread.start()
+    # 같은 세션이 이미 대기/실행 중이면 새로 추가하지 않음
+    existing = job_queue.get(session_id)
+    if existing is None or existing['status'] in TERMINAL_STATES:
+        # 이전 실행의 최종 상태(완료/오류/취소)가 남아 있으면 새 작업이 시작되기도 전에 화면이 끝나버리므로 교체
+        progress_store.set(session_id, {
+            'current_step': '대기열에서 순서를 기다리는 중...',
+            'progress': 0,
+            'completed_videos': 0,
+            'total_videos': len(session_data['uploaded_files']),
+            'status': 'queued'
+        })
+    job_id = job_queue.enqueue('process_videos', {'session_id': session_id}, job_id=session_id)
     
-    return jsonify({'success': True, 'message': '처리가 시작되었습니다.'})
+    return jsonify({'success': True, 'message': '처리가 시작되었습니다.', 'job_id': job_id,
+                    'queue_position': job_queue.position(job_id)})
 
 def parse_srt_timing(srt_path):
     """SRT 파일에서 타이밍 정보 추출"""
@@ -668,8 +885,8 @@ def create_timed_subtitle_data(original_srt_path, translated_text):
             subtitle_data.append((start_time, end_time, line))
         return subtitle_data
     
-    # 번역된 텍스트를 줄 단위로 분할
-    translated_lines = [line.strip() for line in translated_text.split('\n') if line.strip()]
+    # 번역된 텍스트를 줄 단위로 분할 (한 줄이 원본 자막 하나 - 빈 줄도 위치를 유지해야 이후 줄이 밀리지 않음)
+    translated_lines = [line.strip() for line in translated_text.split('\n')]
     subtitle_data = []
     
     print(f"📝 원본 구간: {len(timing_data)}개, 번역 줄: {len(translated_lines)}개")
@@ -688,6 +905,8 @@ def create_timed_subtitle_data(original_srt_path, translated_text):
     print(f"✅ 타이밍 동기화 완료: {len(subtitle_data)}개 구간")
     return subtitle_data
 
+RENDER_VERSION = 1  # 렌더링 방식이 바뀌면 올려서 저장소의 이전 렌더링 결과를 무시
+
 def generate_video_with_overlay(video_path, subtitle_data, output_path, title_text='', title_region=None, subtitle_region=None):
     """자막과 타이틀이 오버레이된 비디오 생성 - 적절한 폰트 사용"""
     import cv2
@@ -719,6 +938,17 @@ def generate_video_with_overlay(video_path, subtitle_data, output_path, title_te
     frame_idx = 0
     
     while True:
+        try:
+            frame_checkpoint(frame_idx)
+        except OperationCancelled:
+            # 취소되면 만들다 만 파일 삭제
+            cap.release()
+            out.release()
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            print(f"🛑 비디오 생성 취소: {output_path}")
+            raise
+        
         ret, frame = cap.read()
         if not ret:
             break
@@ -794,11 +1024,13 @@ def generate_video_with_overlay(video_path, subtitle_data, output_path, title_te
     out.release()
     print(f"✅ 비디오 생성 완료: {frame_idx} 프레임")
 
-def process_all_videos(session_id):
-    """모든 비디오 실제 처리"""
+def process_all_videos(session_id, attempt=1, max_attempts=1):
+    """
+    모든 비디오 실제 처리
+
+    attempt < max_attempts이면 오류 시 최종 상태 대신 재시도 대기 상태를 기록 (작업 큐가 다시 실행)
+    """
     try:
-        progress_file = os.path.join('static/temp', f'progress_{session_id}.json')
-        
         # 세션 정보 파일에서 가져오기
         session_file = os.path.join('static/temp', f'session_{session_id}.json')
         
@@ -839,15 +1071,34 @@ def process_all_videos(session_id):
             'videos': videos_status
         }
         
-        # 진행상황 파일에 저장
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+        # 진행상황 저장 (구독 중인 브라우저에 바로 전달)
+        progress_store.set(session_id, progress_data)
         
         print(f"🚀 Starting processing for {len(uploaded_files)} videos")
         
+        # 자막이 없는 영상이 여러 개면 음성 인식을 한 번에 배치 처리 (짧은 클립 여러 개일 때 처리량 향상)
+        batch_srt_paths = {}
+        pending_indices = [
+            idx for idx in range(len(uploaded_files))
+            if not video_settings.get(str(idx), {}).get('source_subtitles')
+        ]
+        if WHISPER_BATCH_SIZE > 1 and len(pending_indices) > 1:
+            progress_data['current_step'] = f'음성 추출 중 ({len(pending_indices)}개 영상 일괄 처리)...'
+            progress_store.set(session_id, progress_data)
+            
+            temp_output = os.path.join('static/temp', session_id)
+            os.makedirs(temp_output, exist_ok=True)
+            try:
+                srt_paths = transcription_pool.transcribe_batch(
+                    [uploaded_files[idx]['path'] for idx in pending_indices], temp_output, model_size='base')
+                batch_srt_paths = dict(zip(pending_indices, srt_paths))
+            except Exception as e:
+                print(f"⚠️ 일괄 음성 인식 실패, 영상별로 처리합니다: {e}")
+        
         # 실제 비디오 처리
         for video_idx, file_info in enumerate(uploaded_files):
             print(f"🎥 Processing video {video_idx + 1}: {file_info['original_filename']}")
+            raise_if_cancelled()
             
             try:
                 # 비디오 상태를 processing으로 업데이트
@@ -856,8 +1107,7 @@ def process_all_videos(session_id):
                 progress_data['processing_videos'] = 1
                 progress_data['current_step'] = f'비디오 {video_idx + 1}/{len(uploaded_files)} 처리 중...'
                 
-                with open(progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress_data, f, ensure_ascii=False, indent=2)
+                progress_store.set(session_id, progress_data)
                 
                 # 비디오 설정 가져오기
                 video_setting = video_settings.get(str(video_idx), {})
@@ -868,13 +1118,20 @@ def process_all_videos(session_id):
                 
                 if not source_subtitles:
                     # 음성 추출 (Whisper + Claude 개선)
-                    from simple_whisper import extract_audio_with_whisper, get_text_from_srt
+                    from simple_whisper import get_text_from_srt
                     from config import CLAUDE_API_KEY
                     
                     temp_output = os.path.join('static/temp', session_id)
                     os.makedirs(temp_output, exist_ok=True)
                     
-                    srt_path = extract_audio_with_whisper(file_info['path'], temp_output, model_size='base')
+                    srt_path = batch_srt_paths.get(video_idx) or transcription_router.transcribe(file_info['path'], temp_output, model_size='base')
+                    
+                    # 번역 전 자막 구간 재분할 (자막 영역 폭 기준, 번역/렌더링 단위 수 감소)
+                    if CUE_RESEGMENT_ENABLED and subtitle_region:
+                        video_cap = cv2.VideoCapture(file_info['path'])
+                        region_width = int(subtitle_region['width'] * video_cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                        video_cap.release()
+                        resegment_srt_file(srt_path, region_width, get_subtitle_font_for_language('korean'))
                     source_subtitles = get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=CLAUDE_API_KEY)
                 
                 # 번역 처리
@@ -889,21 +1146,29 @@ def process_all_videos(session_id):
                         progress_data['videos'][video_idx]['current_task'] = f'{lang.title()} 타이틀 번역 중...'
                         progress_data['videos'][video_idx]['languages'][lang] = 'processing'
                         
-                        with open(progress_file, 'w', encoding='utf-8') as f:
-                            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+                        progress_store.set(session_id, progress_data)
+                        raise_if_cancelled()
                         
-                        title_translations[lang] = translate_title_claude(source_title, lang)
+                        # 파일명 기반 타이틀이면 업로드 직후 미리 번역해 둔 결과 재사용
+                        title_translations[lang] = speculative_cache.get(
+                            (session_id, 'title', video_idx, lang),
+                            title_signature(source_title, lang, source_language),
+                            timeout=0
+                        ) or translate_title_claude(source_title, lang)
+                
+                # 자막 번역 - 자막(줄) 하나씩, 모든 (자막, 언어) 쌍을 공용 워커 풀에서 처리 (main.py와 동일)
+                source_lines = source_subtitles.split('\n')
+                progress_data['videos'][video_idx]['current_task'] = f'자막 번역 중 ({len(source_lines)}줄 × {len(selected_languages)}개 언어)...'
+                progress_store.set(session_id, progress_data)
+                raise_if_cancelled()
                 
-                # 자막 번역 
+                scheduler = CueTaskScheduler(
+                    lambda line, lang: translate_subtitle_claude(line, lang) if line.strip() else '')
+                line_translations = scheduler.run(source_lines, selected_languages)
                 for lang in selected_languages:
-                    progress_data['videos'][video_idx]['current_task'] = f'{lang.title()} 자막 번역 중...'
-                    
-                    with open(progress_file, 'w', encoding='utf-8') as f:
-                        json.dump(progress_data, f, ensure_ascii=False, indent=2)
-                    
-                    print(f"🌍 자막 번역 시작: {lang}")
-                    subtitle_translations[lang] = translate_subtitle_claude(source_subtitles, lang)
-                    print(f"✅ 자막 번역 완료: {lang} - {len(subtitle_translations[lang])} 글자")
+                    # 번역 결과에 줄바꿈이 섞이면 원본 자막과 줄 위치가 어긋나므로 한 줄로
+                    subtitle_translations[lang] = '\n'.join(' '.join(line.split('\n')) for line in line_translations[lang])
+                    print(f"✅ 자막 번역 완료: {lang} - {len(source_lines)}줄")
                 
                 # 비디오 생성
                 output_dir = os.path.join(PROCESSED_FOLDER, session_id)
@@ -912,8 +1177,8 @@ def process_all_videos(session_id):
                 for lang in selected_languages:
                     progress_data['videos'][video_idx]['current_task'] = f'{lang.title()} 비디오 생성 중...'
                     
-                    with open(progress_file, 'w', encoding='utf-8') as f:
-                        json.dump(progress_data, f, ensure_ascii=False, indent=2)
+                    progress_store.set(session_id, progress_data)
+                    raise_if_cancelled()
                     
                     try:
                         # 실제 자막 오버레이가 적용된 비디오 생성
@@ -927,9 +1192,10 @@ def process_all_videos(session_id):
                         subtitle_timing_data = []
                         if source_subtitles and subtitle_translations.get(lang):
                             # 원본 SRT 파일 경로 찾기
+                            # 음성 인식 결과는 저장된 영상 파일명 기준으로 생성됨
                             temp_output = os.path.join('static/temp', session_id)
-                            base_name = os.path.splitext(file_info['original_filename'])[0]
-                            original_srt_path = os.path.join(temp_output, f"{base_name}_korean.srt")
+                            srt_base_name = os.path.splitext(os.path.basename(file_info['path']))[0]
+                            original_srt_path = os.path.join(temp_output, f"{srt_base_name}_korean.srt")
                             
                             if os.path.exists(original_srt_path):
                                 print(f"📍 원본 SRT 파일 발견: {original_srt_path}")
@@ -973,24 +1239,45 @@ def process_all_videos(session_id):
                                 int((subtitle_region['y'] + subtitle_region['height']) * video_height)
                             )
                         
-                        # 실제 비디오 생성 (자막 오버레이 포함)
-                        try:
-                            generate_video_with_overlay(
-                                video_path=file_info['path'],
-                                subtitle_data=subtitle_timing_data,
-                                output_path=output_path,
-                                title_text=title_translations.get(lang, ''),
-                                title_region=title_coords,
-                                subtitle_region=subtitle_coords
-                            )
-                            print(f"✅ {lang} 비디오 생성 완료: {output_path}")
-                        except Exception as video_error:
-                            print(f"⚠️ {lang} 비디오 생성 실패, 원본 복사: {video_error}")
-                            import traceback
-                            traceback.print_exc()
-                            # 비디오 생성 실패 시 원본 복사
-                            import shutil
-                            shutil.copy2(file_info['path'], output_path)
+                        # 같은 영상/번역/영역으로 렌더링한 결과가 있으면 재사용 (다른 세션 결과 포함)
+                        render_params = {
+                            'renderer': RENDER_VERSION,
+                            'language': lang,
+                            'title': title_translations.get(lang, ''),
+                            'title_region': title_coords,
+                            'subtitle_region': subtitle_coords,
+                            'subtitles': subtitle_timing_data
+                        }
+                        source_hash = file_info.get('sha256') or file_content_hash(file_info['path'])
+                        cached_render = media_store.find_artifact('render', source_hash, render_params, '.mp4')
+                        
+                        # 기존 출력은 저장소와 링크된 파일일 수 있으므로 덮어쓰지 않고 먼저 삭제
+                        if os.path.exists(output_path):
+                            os.remove(output_path)
+                        
+                        if cached_render:
+                            media_store.export(cached_render, output_path)
+                            print(f"♻️  {lang} 렌더링 결과 재사용: {output_path}")
+                        else:
+                            # 실제 비디오 생성 (자막 오버레이 포함)
+                            try:
+                                generate_video_with_overlay(
+                                    video_path=file_info['path'],
+                                    subtitle_data=subtitle_timing_data,
+                                    output_path=output_path,
+                                    title_text=title_translations.get(lang, ''),
+                                    title_region=title_coords,
+                                    subtitle_region=subtitle_coords
+                                )
+                                media_store.save_artifact(output_path, 'render', source_hash, render_params, '.mp4')
+                                print(f"✅ {lang} 비디오 생성 완료: {output_path}")
+                            except Exception as video_error:
+                                print(f"⚠️ {lang} 비디오 생성 실패, 원본 복사: {video_error}")
+                                import traceback
+                                traceback.print_exc()
+                                # 비디오 생성 실패 시 원본 복사
+                                import shutil
+                                shutil.copy2(file_info['path'], output_path)
                         
                         # 번역된 텍스트 파일도 저장
                         txt_path = os.path.join(output_dir, f"{base_name}_{lang}.txt")
@@ -1015,6 +1302,7 @@ def process_all_videos(session_id):
                 progress_data['videos'][video_idx]['progress'] = 100
                 progress_data['completed_videos'] += 1
                 progress_data['processing_videos'] = 0
+                progress_store.set(session_id, progress_data)
                 
                 print(f"✅ 비디오 {video_idx + 1} 처리 완료")
                 
@@ -1023,58 +1311,165 @@ def process_all_videos(session_id):
                 progress_data['videos'][video_idx]['status'] = 'error'
                 progress_data['videos'][video_idx]['current_task'] = f'오류: {str(e)}'
                 progress_data['processing_videos'] = 0
+                progress_store.set(session_id, progress_data)
         
         # 전체 처리 완료
         progress_data['current_step'] = '모든 비디오 처리 완료'
         progress_data['progress'] = 100
         progress_data['status'] = 'completed'
         
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+        progress_store.set(session_id, progress_data)
         
         print("🎉 모든 비디오 처리 완료!")
         
+    except OperationCancelled:
+        print(f"🛑 처리 중단됨: {session_id}")
+        # 중단 요청 이후에 기록된 진행상황을 덮어씀
+        progress_store.set(session_id, {
+            'current_step': '사용자에 의해 중단됨',
+            'progress': 0,
+            'status': 'cancelled'
+        })
+        raise
     except Exception as e:
         print(f"❌ 전체 처리 오류: {e}")
-        # 오류 상태 저장
-        progress_data = {
-            'current_step': f'처리 중 오류 발생: {str(e)}',
-            'progress': 0,
-            'status': 'error',
-            'error': str(e)
-        }
-        
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
-
-@app.route('/progress/<session_id>')
-def get_progress(session_id):
-    """처리 진행상황 조회"""
-    progress_file = os.path.join('static/temp', f'progress_{session_id}.json')
-    
-    try:
-        if os.path.exists(progress_file):
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                progress_data = json.load(f)
+        if attempt < max_attempts:
+            # 재시도가 남았으면 최종 상태가 아닌 상태로 남겨 브라우저가 계속 지켜보도록
+            progress_data = {
+                'current_step': f'처리 중 오류 발생, 재시도 대기 중 ({attempt}/{max_attempts}회차): {str(e)}',
+                'progress': 0,
+                'status': 'retrying',
+                'attempt': attempt,
+                'max_attempts': max_attempts,
+                'error': str(e)
+            }
         else:
-            # 기본 진행상황
+            # 오류 상태 저장
             progress_data = {
-                'current_step': '준비 중...',
+                'current_step': f'처리 중 오류 발생: {str(e)}',
                 'progress': 0,
-                'completed_videos': 0,
-                'total_videos': 0,
-                'status': 'waiting'
+                'status': 'error',
+                'error': str(e)
             }
         
-        return jsonify(progress_data)
+        progress_store.set(session_id, progress_data)
+        # 작업 큐가 재시도 여부를 판단하도록 다시 발생
+        raise
+
+# === 작업 큐 워커 ===
+def run_process_videos_job(job_id, payload, attempt, max_attempts):
+    """작업 큐 처리 함수 - 세션의 전체 비디오 처리"""
+    session_id = payload['session_id']
+    with job_context(session_id):
+        process_all_videos(session_id, attempt, max_attempts)
+
+def abandon_process_videos_job(job):
+    """워커가 죽어 시도 횟수를 다 쓴 작업 - 브라우저가 기다리지 않도록 최종 오류 상태 기록"""
+    progress_store.set(job['payload']['session_id'], {
+        'current_step': '처리 중 오류 발생: 처리 프로세스가 응답 없이 종료되었습니다.',
+        'progress': 0,
+        'status': 'error',
+        'error': job.get('error') or 'worker lost'
+    })
+
+job_workers = JobWorkerPool(job_queue, {'process_videos': run_process_videos_job},
+                            on_abandoned=abandon_process_videos_job)
+job_workers.start()
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """작업 큐 상태 조회 (상태, 시도 횟수, 마지막 오류, 대기 순번)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    job['queue_position'] = job_queue.position(job_id)
+    return jsonify(job)
+
+# 진행상황이 아직 없을 때의 기본값
+DEFAULT_PROGRESS = {
+    'current_step': '준비 중...',
+    'progress': 0,
+    'completed_videos': 0,
+    'total_videos': 0,
+    'status': 'waiting'
+}
+
+@app.route('/progress/<session_id>')
+def get_progress(session_id):
+    """처리 진행상황 조회 (폴링용, 변경이 없으면 304)"""
+    version, progress_data = progress_store.get(session_id)
+    etag = progress_store.etag(session_id, version)
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    
+    response = jsonify(progress_data or DEFAULT_PROGRESS)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# SSE 연결은 요청 스레드를 계속 점유하므로 동시 연결 수를 제한 (나머지 요청이 밀리지 않도록)
+_stream_slots = threading.BoundedSemaphore(PROGRESS_STREAM_MAX_CONNECTIONS)
+
+@app.route('/progress/<session_id>/stream')
+def stream_progress(session_id):
+    """
+    처리 진행상황 SSE 스트림 (처음에 전체 상태, 이후 변경분만 전송, 최종 상태에서 종료)
+
+    연결은 PROGRESS_STREAM_MAX_SECONDS마다 끊고 브라우저가 Last-Event-ID로 이어받음
+    동시 연결이 가득 차면 503 - 브라우저는 폴링으로 전환
+    """
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    version, data = progress_store.get(session_id)
+    if last_event_id == progress_store.etag(session_id, version) and data and data.get('status') in FINAL_STATES:
+        # 최종 상태를 이미 받은 브라우저의 재연결 - 204로 재연결 중지
+        return Response(status=204)
+    if not _stream_slots.acquire(blocking=False):
+        return Response(status=503, headers={'Retry-After': '5'})
+    
+    def events(version, data):
+        deadline = time.time() + PROGRESS_STREAM_MAX_SECONDS
+        if last_event_id != progress_store.etag(session_id, version):
+            yield f"id: {progress_store.etag(session_id, version)}\nevent: snapshot\ndata: {json.dumps(data or DEFAULT_PROGRESS, ensure_ascii=False)}\n\n"
         
-    except Exception as e:
-        return jsonify({
-            'current_step': '상태 조회 오류',
-            'progress': 0,
-            'status': 'error',
-            'error': str(e)
-        })
+        while not (data and data.get('status') in FINAL_STATES):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                # 스레드를 돌려주고 재연결 (대기열에서 오래 기다리는 작업도 연결을 붙잡지 않도록)
+                yield "retry: 1000\n\n"
+                return
+            new_version, new_data = progress_store.wait(session_id, version, timeout=min(15, remaining))
+            if new_version == version:
+                yield ": keepalive\n\n"  # 프록시 연결 유지
+                continue
+            if new_version < version:
+                # 저장소가 초기화됨 - 전체 상태 다시 전송
+                event, payload = 'snapshot', new_data or DEFAULT_PROGRESS
+            else:
+                event, payload = 'patch', merge_patch(data or DEFAULT_PROGRESS, new_data)
+            version, data = new_version, new_data
+            yield f"id: {progress_store.etag(session_id, version)}\nevent: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    
+    response = Response(events(version, data), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(_stream_slots.release)
+    return response
+
+@app.route('/metrics')
+def get_metrics():
+    """외부 API 호출 통계 (전체 집계 + 최근 작업 목록 + 음성 인식 경로 결정 내역)"""
+    return jsonify({
+        'aggregate': metrics.summary(),
+        'jobs': metrics.jobs(),
+        'transcription_routing': transcription_router.recent_decisions()
+    })
+
+@app.route('/metrics/<job_id>')
+def get_job_metrics(job_id):
+    """작업(세션)별 외부 API 호출 통계"""
+    return jsonify({
+        'job_id': job_id,
+        'summary': metrics.summary(job_id)
+    })
 
 @app.route('/download/<session_id>/<filename>')
 def download_file(session_id, filename):
@@ -1082,6 +1477,24 @@ def download_file(session_id, filename):
     download_folder = os.path.join(PROCESSED_FOLDER, session_id)
     return send_from_directory(download_folder, filename)
 
+def zip_response(files, download_name):
+    """
+    파일 목록을 ZIP으로 바로 스트리밍 (임시 파일 없음, 압축 없이 저장, 정확한 Content-Length)
+    
+    Args:
+        files: [(파일 경로, ZIP 내 이름)]
+    """
+    from urllib.parse import quote
+    
+    archive = ZipStream(files)
+    response = Response(iter(archive), mimetype='application/zip')
+    response.headers['Content-Length'] = str(archive.content_length())
+    ascii_name = download_name.encode('ascii', 'ignore').decode() or 'download.zip'
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="{ascii_name}"; filename*=UTF-8\'\'{quote(download_name)}'
+    )
+    return response
+
 @app.route('/download_all')
 def download_all():
     """모든 처리된 파일을 ZIP으로 다운로드"""
@@ -1122,23 +1535,13 @@ def download_all():
         
         print(f"✅ Created {len(uploaded_files) * len(selected_languages)} test files")
     
-    # ZIP 파일 생성 로직 (실제 구현 필요)
-    import zipfile
-    import tempfile
-    
-    temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    
-    with zipfile.ZipFile(temp_zip.name, 'w') as zf:
-        for root, dirs, files in os.walk(download_folder):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, download_folder)
-                zf.write(file_path, arcname)
+    files_to_zip = []
+    for root, dirs, files in os.walk(download_folder):
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            files_to_zip.append((file_path, os.path.relpath(file_path, download_folder)))
     
-    return send_from_directory(os.path.dirname(temp_zip.name), 
-                             os.path.basename(temp_zip.name),
-                             as_attachment=True,
-                             download_name=f'translated_videos_{session_id}.zip')
+    return zip_response(files_to_zip, f'translated_videos_{session_id}.zip')
 
 @app.route('/download_individual/<int:video_index>/<language>')
 def download_individual(video_index, language):
@@ -1211,6 +1614,11 @@ def download_video_all(video_index):
     # 각 언어별 파일 생성 (테스트용)
     files_to_zip = []
     for lang in selected_languages:
+        video_filename = f"{base_name}_{lang}.mp4"
+        video_path = os.path.join(processed_folder, video_filename)
+        if os.path.exists(video_path):
+            files_to_zip.append((video_path, video_filename))
+        
         filename = f"{base_name}_{lang}.txt"
         file_path = os.path.join(processed_folder, filename)
         
@@ -1226,22 +1634,7 @@ def download_video_all(video_index):
         
         files_to_zip.append((file_path, filename))
     
-    # ZIP 파일 생성
-    import zipfile
-    import tempfile
-    
-    temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    
-    with zipfile.ZipFile(temp_zip.name, 'w') as zf:
-        for file_path, arcname in files_to_zip:
-            zf.write(file_path, arcname)
-    
-    return send_from_directory(
-        os.path.dirname(temp_zip.name),
-        os.path.basename(temp_zip.name),
-        as_attachment=True,
-        download_name=f"{base_name}_all_languages.zip"
-    )
+    return zip_response(files_to_zip, f"{base_name}_all_languages.zip")
 
 @app.route('/cancel_processing', methods=['POST'])
 def cancel_processing():
@@ -1250,7 +1643,10 @@ def cancel_processing():
         return jsonify({'error': '세션이 없습니다.'}), 400
     
     session_id = session['session_id']
-    progress_file = os.path.join('static/temp', f'progress_{session_id}.json')
+    
+    # 대기 중인 작업은 큐에서 빼고, 실행 중인 작업은 취소 토큰으로 중단 (외부 프로세스 즉시 종료)
+    job_queue.cancel(session_id)
+    cancellation_registry.cancel(session_id)
     
     # 취소 상태로 업데이트
     progress_data = {
@@ -1260,8 +1656,7 @@ def cancel_processing():
     }
     
     try:
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+        progress_store.set(session_id, progress_data)
         
         return jsonify({'success': True, 'message': '처리가 중단되었습니다.'})
     except Exception as e:
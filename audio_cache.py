@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+오디오 추출 캐시
+원본 파일 내용 해시를 키로 16kHz 모노 PCM WAV(및 압축본)를 한 번만 추출해 모든 음성 인식 경로에서 재사용
+"""
+
+import hashlib
+import json
+import os
+import threading
+import wave
+
+import numpy as np
+
+from config import CACHE_DIR
+from cancellation import run_process
+from audio_vad import detect_speech_segments, build_speech_audio, vad_settings
+
+AUDIO_CACHE_DIR = os.path.join(CACHE_DIR, "audio")
+SAMPLE_RATE = 16000
+
+_hash_memo = {}   # (절대경로, 크기, 수정시각) → 해시
+_locks = {}       # 캐시 파일 경로 → 추출 중복 방지 락
+_locks_guard = threading.Lock()
+
+
+def file_content_hash(path, chunk_size=1024 * 1024):
+    """파일 내용 SHA-256 (같은 파일은 크기/수정시각 기준으로 재계산하지 않음)"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def remember_content_hash(path, digest):
+    """이미 계산한 해시 등록 (업로드 중 계산한 해시를 재사용해 파일을 다시 읽지 않음)"""
+    stat = os.stat(path)
+    _hash_memo[(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)] = digest
+
+
+def _path_lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def _run_ffmpeg(args, output_path):
+    """임시 파일로 출력 후 완료되면 교체 (중단된 추출 결과가 캐시에 남지 않도록)"""
+    tmp_path = f"{output_path}.{threading.get_ident()}.tmp{os.path.splitext(output_path)[1]}"
+    try:
+        result = run_process(['ffmpeg', '-y', *args, tmp_path], capture_output=True, text=True, timeout=600)
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg 오디오 추출 실패: {result.stderr[-500:]}")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def extract_audio(video_path):
+    """
+    16kHz 모노 PCM WAV 추출 (캐시 적중 시 추출 생략)
+
+    Returns:
+        str: 캐시된 WAV 파일 경로
+
+    Raises:
+        FileNotFoundError: ffmpeg가 설치되어 있지 않은 경우
+    """
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    audio_hash = file_content_hash(video_path)
+    wav_path = os.path.join(AUDIO_CACHE_DIR, f"{audio_hash}.wav")
+
+    with _path_lock(wav_path):
+        if os.path.exists(wav_path):
+            print(f"♻️  오디오 캐시 사용: {os.path.basename(wav_path)}")
+            return wav_path
+
+        print("비디오에서 오디오 추출 중...")
+        _run_ffmpeg(['-i', video_path, '-vn', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-ac', '1'], wav_path)
+        print("✅ 오디오 추출 완료!")
+        return wav_path
+
+
+def extract_speech_audio(video_path):
+    """
+    음성 구간만 남긴 WAV 생성 (VAD 설정별로 캐시)
+
+    Returns:
+        tuple: (음성 WAV 경로, 타임라인 [(압축 시작 초, 원본 시작 초, 길이 초)]) - 음성이 없으면 타임라인이 빈 목록
+    """
+    wav_path = extract_audio(video_path)
+    settings_key = hashlib.sha1(json.dumps(vad_settings(), sort_keys=True).encode()).hexdigest()[:10]
+    speech_path = os.path.join(AUDIO_CACHE_DIR, f"{os.path.splitext(os.path.basename(wav_path))[0]}_speech_{settings_key}.wav")
+    timeline_path = os.path.splitext(speech_path)[0] + ".json"
+
+    with _path_lock(speech_path):
+        if os.path.exists(speech_path) and os.path.exists(timeline_path):
+            with open(timeline_path, 'r', encoding='utf-8') as f:
+                return speech_path, [tuple(entry) for entry in json.load(f)]
+
+        pcm = load_pcm(wav_path)
+        segments = detect_speech_segments(pcm)
+        speech_pcm, timeline = build_speech_audio(pcm, segments)
+        total = len(pcm) / SAMPLE_RATE
+        kept = len(speech_pcm) / SAMPLE_RATE
+        print(f"🔇 음성 구간 검출: {len(segments)}개 구간, {total:.1f}초 중 {kept:.1f}초 사용")
+
+        write_wav(speech_path + ".tmp", speech_pcm)
+        os.replace(speech_path + ".tmp", speech_path)
+        with open(timeline_path, 'w', encoding='utf-8') as f:
+            json.dump(timeline, f)
+        return speech_path, timeline
+
+
+def compress_audio(wav_path, codec="opus", bitrate="24k"):
+    """
+    WAV를 음성용 저비트레이트 압축 오디오로 변환 (WAV와 같은 폴더에 캐시)
+
+    opus는 Ogg 컨테이너(.ogg)와 음성 최적화 모드(voip) 사용
+    """
+    ext = {"opus": "ogg", "mp3": "mp3"}.get(codec, codec)
+    codec_args = {"opus": ['-c:a', 'libopus', '-application', 'voip'], "mp3": ['-c:a', 'libmp3lame']}.get(codec, ['-c:a', codec])
+    compressed_path = os.path.join(os.path.dirname(wav_path), f"{os.path.splitext(os.path.basename(wav_path))[0]}_{codec}_{bitrate}.{ext}")
+
+    with _path_lock(compressed_path):
+        if os.path.exists(compressed_path):
+            return compressed_path
+        _run_ffmpeg(['-i', wav_path, *codec_args, '-b:a', bitrate, '-ac', '1'], compressed_path)
+        return compressed_path
+
+
+def extract_compressed_audio(video_path, codec="opus", bitrate="24k"):
+    """캐시된 WAV에서 압축 오디오 생성 (업로드 크기 절감용)"""
+    return compress_audio(extract_audio(video_path), codec, bitrate)
+
+
+def encoded_bytes_per_second(codec, bitrate):
+    """코덱/비트레이트 기준 초당 예상 크기 (가변 비트레이트 초과분과 컨테이너 오버헤드로 50% 여유)"""
+    if codec == "wav":
+        return SAMPLE_RATE * 2
+    bits = float(bitrate.lower().rstrip('k')) * (1000 if bitrate.lower().endswith('k') else 1)
+    return bits / 8 * 1.5
+
+
+def load_pcm(wav_path):
+    """WAV 파일을 Whisper 입력 형식(float32, -1.0 ~ 1.0)으로 로드"""
+    with wave.open(wav_path, 'rb') as wf:
+        frames = wf.readframes(wf.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def write_wav(wav_path, pcm, sample_rate=SAMPLE_RATE):
+    """float32 PCM을 16-bit 모노 WAV로 저장"""
+    samples = (np.clip(pcm, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(wav_path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
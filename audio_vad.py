@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+에너지 기반 음성 구간 분석 (NumPy 벡터 연산)
+긴 오디오를 무음 지점에서 나누기 위한 분할 지점 계산과
+무음/음악 구간을 걸러내는 음성 구간 검출(VAD), 원래 시간축으로의 타임스탬프 복원
+"""
+
+import bisect
+
+import numpy as np
+
+from config import (
+    VAD_ENERGY_MARGIN_DB, VAD_SPEECH_BAND_RATIO, VAD_MIN_SPEECH, VAD_MIN_SILENCE, VAD_PADDING, VAD_MIN_COVERAGE
+)
+
+SAMPLE_RATE = 16000
+SPEECH_BAND = (300, 3400)  # 음성 주요 대역 (Hz)
+
+
+def frame_energies_db(pcm, sample_rate=SAMPLE_RATE, frame_ms=30):
+    """프레임별 RMS 에너지 (dBFS)"""
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(pcm) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = pcm[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _smoothed_energies(energies, frames_per_second):
+    """순간적인 끊김보다 실제 무음 구간을 고르도록 ±0.3초 이동 평균"""
+    smooth = max(1, int(0.3 * frames_per_second))
+    return np.convolve(energies, np.ones(2 * smooth + 1) / (2 * smooth + 1), mode='same')
+
+
+def find_quiet_point(pcm, target_seconds, sample_rate=SAMPLE_RATE, frame_ms=30, search_seconds=15):
+    """target_seconds 전후 search_seconds 안에서 가장 조용한 지점의 샘플 인덱스"""
+    energies = frame_energies_db(pcm, sample_rate, frame_ms)
+    if len(energies) == 0:
+        return 0
+    frames_per_second = 1000 / frame_ms
+    smoothed = _smoothed_energies(energies, frames_per_second)
+    center = int(target_seconds * frames_per_second)
+    window_start = max(1, center - int(search_seconds * frames_per_second))
+    window_end = min(len(energies) - 1, center + int(search_seconds * frames_per_second))
+    if window_start >= window_end:
+        return min(len(pcm), max(0, int(target_seconds * sample_rate)))
+    split_frame = window_start + int(np.argmin(smoothed[window_start:window_end]))
+    return split_frame * int(sample_rate * frame_ms / 1000)
+
+
+def find_split_points(pcm, max_chunk_seconds, sample_rate=SAMPLE_RATE, frame_ms=30, search_seconds=30):
+    """
+    각 청크가 max_chunk_seconds를 넘지 않도록 가장 조용한 지점에서 분할
+
+    목표 경계 직전 search_seconds 구간에서 주변(±0.3초) 평균 에너지가 가장 낮은 프레임을 고름
+
+    Returns:
+        list: 분할 지점 샘플 인덱스 목록 (시작 0, 끝 len(pcm) 제외)
+    """
+    total_seconds = len(pcm) / sample_rate
+    if total_seconds <= max_chunk_seconds:
+        return []
+
+    energies = frame_energies_db(pcm, sample_rate, frame_ms)
+    frames_per_second = 1000 / frame_ms
+    smoothed = _smoothed_energies(energies, frames_per_second)
+
+    search_frames = int(min(search_seconds, max_chunk_seconds / 4) * frames_per_second)
+    max_frames = int(max_chunk_seconds * frames_per_second)
+    frame_len = int(sample_rate * frame_ms / 1000)
+
+    split_points = []
+    start = 0
+    while len(energies) - start > max_frames:
+        window_end = start + max_frames
+        window_start = max(start + 1, window_end - search_frames)
+        split_frame = window_start + int(np.argmin(smoothed[window_start:window_end]))
+        split_points.append(split_frame * frame_len)
+        start = split_frame
+    return split_points
+
+
+def vad_settings():
+    """VAD 파라미터 (캐시 키 구성용)"""
+    return {
+        'energy_margin_db': VAD_ENERGY_MARGIN_DB,
+        'speech_band_ratio': VAD_SPEECH_BAND_RATIO,
+        'min_speech': VAD_MIN_SPEECH,
+        'min_silence': VAD_MIN_SILENCE,
+        'padding': VAD_PADDING,
+        'min_coverage': VAD_MIN_COVERAGE,
+    }
+
+
+def _speech_band_ratios(pcm, sample_rate, frame_len, n_frames, block=4096):
+    """프레임별 음성 대역 에너지 비율 (메모리 사용을 줄이려 블록 단위 FFT)"""
+    freqs = np.fft.rfftfreq(frame_len, 1.0 / sample_rate)
+    in_band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+    window = np.hanning(frame_len).astype(np.float32)
+
+    ratios = np.empty(n_frames, dtype=np.float32)
+    for start in range(0, n_frames, block):
+        end = min(n_frames, start + block)
+        frames = pcm[start * frame_len:end * frame_len].reshape(end - start, frame_len) * window
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        total = power.sum(axis=1)
+        ratios[start:end] = power[:, in_band].sum(axis=1) / np.maximum(total, 1e-12)
+    return ratios
+
+
+def _runs(mask):
+    """불리언 배열의 True 구간 [(시작, 끝)] (끝은 제외)"""
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(changes[::2], changes[1::2]))
+
+
+def detect_speech_segments(pcm, sample_rate=SAMPLE_RATE, frame_ms=30,
+                           energy_margin_db=VAD_ENERGY_MARGIN_DB, speech_band_ratio=VAD_SPEECH_BAND_RATIO,
+                           min_speech=VAD_MIN_SPEECH, min_silence=VAD_MIN_SILENCE, padding=VAD_PADDING,
+                           min_coverage=VAD_MIN_COVERAGE):
+    """
+    음성 구간 검출
+
+    배경 잡음(하위 10% 에너지) 대비 충분히 크고, 에너지 대부분이 음성 대역에 있는 프레임을 음성으로 판단
+    (저음/고음 비중이 큰 배경 음악은 대역 비율에서 걸러짐)
+    소리가 있는 구간에 비해 검출된 음성이 너무 적으면(음악/잡음 위의 말소리, 처음부터 끝까지 말하는 클립 등)
+    말소리를 놓쳤을 가능성이 크므로 전체 구간을 반환
+
+    Returns:
+        list: [(시작 초, 끝 초)] 시간순, 겹치지 않음
+    """
+    energies = frame_energies_db(pcm, sample_rate, frame_ms)
+    if len(energies) == 0:
+        return []
+
+    frame_len = int(sample_rate * frame_ms / 1000)
+    frame_seconds = frame_ms / 1000
+    noise_floor = np.percentile(energies, 10)
+    threshold = max(noise_floor + energy_margin_db, -50.0)
+
+    speech = energies > threshold
+    if speech.any():
+        speech &= _speech_band_ratios(pcm, sample_rate, frame_len, len(energies)) >= speech_band_ratio
+
+    # 짧은 무음은 메우고, 짧은 음성은 버림
+    segments = []
+    for start, end in _runs(speech):
+        if segments and (start - segments[-1][1]) * frame_seconds < min_silence:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+
+    total_seconds = len(pcm) / sample_rate
+    padded = []
+    for start, end in segments:
+        if (end - start) * frame_seconds < min_speech:
+            continue
+        start_sec = float(max(0.0, start * frame_seconds - padding))
+        end_sec = float(min(total_seconds, end * frame_seconds + padding))
+        if padded and start_sec <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end_sec)
+        else:
+            padded.append((start_sec, end_sec))
+
+    audible = float(np.mean(energies > -50.0)) * total_seconds
+    covered = sum(end_sec - start_sec for start_sec, end_sec in padded)
+    if audible > 0 and covered < min_coverage * audible:
+        print(f"⚠️ 검출된 음성이 너무 적어 ({covered:.1f}초 / 소리 {audible:.1f}초) 전체 오디오를 사용합니다")
+        return [(0.0, float(total_seconds))]
+    return padded
+
+
+def build_speech_audio(pcm, segments, sample_rate=SAMPLE_RATE, gap_seconds=0.5):
+    """
+    음성 구간만 이어 붙인 PCM 생성 (구간 사이에 짧은 무음을 넣어 문장 경계 유지)
+
+    Returns:
+        tuple: (음성 PCM, 타임라인 [(압축 시작 초, 원본 시작 초, 길이 초)])
+    """
+    gap = np.zeros(int(gap_seconds * sample_rate), dtype=pcm.dtype)
+    pieces = []
+    timeline = []
+    position = 0.0
+    for start_sec, end_sec in segments:
+        piece = pcm[int(start_sec * sample_rate):int(end_sec * sample_rate)]
+        if pieces:
+            pieces.append(gap)
+            position += gap_seconds
+        pieces.append(piece)
+        timeline.append((position, start_sec, len(piece) / sample_rate))
+        position += len(piece) / sample_rate
+
+    speech_pcm = np.concatenate(pieces) if pieces else np.zeros(0, dtype=pcm.dtype)
+    return speech_pcm, timeline
+
+
+def remap_time(seconds, timeline):
+    """음성 PCM 기준 시각을 원본 시간축으로 변환 (구간 사이 무음에 걸리면 가까운 구간 끝으로)"""
+    if not timeline:
+        return seconds
+    index = max(0, bisect.bisect_right([entry[0] for entry in timeline], seconds) - 1)
+    compact_start, original_start, duration = timeline[index]
+    return original_start + min(max(seconds - compact_start, 0.0), duration)
+
+
+def split_windows(segments, max_seconds=30.0):
+    """음성 구간을 Whisper 입력 길이(30초) 이하의 창으로 분할 (긴 구간은 같은 길이로 나눔)"""
+    windows = []
+    for start_sec, end_sec in segments:
+        pieces = max(1, int(np.ceil((end_sec - start_sec) / max_seconds)))
+        step = (end_sec - start_sec) / pieces
+        windows.extend((start_sec + i * step, start_sec + (i + 1) * step) for i in range(pieces))
+    return windows
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+작업 취소 토큰
+작업(job)마다 토큰을 만들어 contextvar로 전달하고, 긴 단계(음성 인식/번역/프레임 루프) 사이에서 확인
+취소되면 등록된 외부 프로세스(ffmpeg 등)를 바로 종료
+"""
+
+import contextvars
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from config import CANCEL_CHECK_FRAMES
+
+_current_token = contextvars.ContextVar('cancellation_token', default=None)
+
+
+class OperationCancelled(BaseException):
+    """
+    사용자가 취소한 작업
+
+    일반 오류 처리(except Exception)에서 삼켜지지 않도록 BaseException을 상속
+    """
+
+
+class CancellationToken:
+    def __init__(self, key):
+        self.key = key
+        self._event = threading.Event()
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """취소 표시 후 실행 중인 외부 프로세스 종료"""
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            _terminate(process)
+
+    def check(self):
+        if self._event.is_set():
+            raise OperationCancelled(self.key)
+
+    def wait(self, seconds):
+        """seconds초 대기 (도중에 취소되면 바로 예외)"""
+        self._event.wait(seconds)
+        self.check()
+
+    @contextmanager
+    def track_process(self, process):
+        """블록 안에서 실행 중인 프로세스를 취소 시 종료 대상으로 등록"""
+        with self._lock:
+            self._processes.add(process)
+        try:
+            if self.cancelled:
+                _terminate(process)
+            yield process
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+
+def _terminate(process, grace=2.0):
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class CancellationRegistry:
+    def __init__(self):
+        self._tokens = {}  # 작업 ID → 토큰
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self, key):
+        """작업 실행 동안 토큰을 등록하고 현재 컨텍스트에 설정"""
+        token = CancellationToken(key)
+        with self._lock:
+            self._tokens[key] = token
+        context_token = _current_token.set(token)
+        try:
+            yield token
+        finally:
+            _current_token.reset(context_token)
+            with self._lock:
+                if self._tokens.get(key) is token:
+                    del self._tokens[key]
+
+    def cancel(self, key):
+        """실행 중인 작업 취소 (해당 작업이 없으면 False)"""
+        with self._lock:
+            token = self._tokens.get(key)
+        if token is None:
+            return False
+        token.cancel()
+        print(f"🛑 작업 취소 요청: {key}")
+        return True
+
+
+cancellation_registry = CancellationRegistry()
+
+
+def current_token():
+    return _current_token.get()
+
+
+def raise_if_cancelled():
+    """현재 작업이 취소되었으면 OperationCancelled 발생 (취소 토큰이 없으면 무시)"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def cancellable_sleep(seconds):
+    """취소되면 바로 깨어나는 time.sleep"""
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.wait(seconds)
+
+
+def frame_checkpoint(frame_idx):
+    """프레임 루프에서 CANCEL_CHECK_FRAMES 프레임마다 취소 확인"""
+    if frame_idx % CANCEL_CHECK_FRAMES == 0:
+        raise_if_cancelled()
+
+
+def run_process(args, timeout=None, **kwargs):
+    """
+    subprocess.run과 같지만 현재 작업이 취소되면 프로세스를 종료하고 OperationCancelled 발생
+
+    Returns:
+        subprocess.CompletedProcess
+    """
+    token = _current_token.get()
+    if token is None:
+        return subprocess.run(args, timeout=timeout, **kwargs)
+
+    token.check()
+    capture = kwargs.pop('capture_output', False)
+    if capture:
+        kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+    process = subprocess.Popen(args, **kwargs)
+    with token.track_process(process):
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+    token.check()
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+분할 업로드 (이어받기 지원)
+청크를 받는 즉시 최종 파일 끝에 이어 쓰고 SHA-256을 함께 갱신
+연결이 끊기면 클라이언트는 서버가 받은 바이트 수(offset)부터 다시 전송
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_SIZE, UPLOAD_PARTIAL_TTL
+
+READ_BLOCK = 64 * 1024
+
+
+class UploadError(Exception):
+    """잘못된 업로드 요청"""
+
+
+class UploadOffsetMismatch(UploadError):
+    """클라이언트 offset이 서버에 저장된 크기와 다름 (status로 다시 확인 필요)"""
+
+    def __init__(self, offset):
+        super().__init__(f"offset 불일치 (서버: {offset})")
+        self.offset = offset
+
+
+class ChunkedUploadStore:
+    def __init__(self, base_dir, max_size=UPLOAD_MAX_SIZE, partial_ttl=UPLOAD_PARTIAL_TTL):
+        self.base_dir = base_dir
+        self.max_size = max_size
+        self.partial_ttl = partial_ttl
+        self._hashers = {}  # upload_id → (받은 바이트 수, sha256 객체)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _paths(self, upload_id):
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError("잘못된 업로드 ID")
+        base = os.path.join(self.base_dir, upload_id)
+        return base + '.part', base + '.json'
+
+    def _lock(self, upload_id):
+        with self._guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _load(self, upload_id):
+        part_path, meta_path = self._paths(upload_id)
+        if not os.path.exists(meta_path) or not os.path.exists(part_path):
+            raise UploadError("업로드를 찾을 수 없습니다")
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _hasher(self, upload_id, part_path):
+        """받은 만큼 갱신된 해시 객체 (재시작 등으로 메모리에 없으면 받은 부분을 한 번 다시 읽음)"""
+        size = os.path.getsize(part_path)
+        entry = self._hashers.get(upload_id)
+        if entry is None or entry[0] != size:
+            digest = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            entry = (size, digest)
+            self._hashers[upload_id] = entry
+        return entry[1]
+
+    def init(self, filename, size):
+        """
+        업로드 시작
+
+        Returns:
+            dict: upload_id, offset(0), chunk_size
+        """
+        if size <= 0 or size > self.max_size:
+            raise UploadError(f"파일 크기가 허용 범위를 벗어났습니다 (최대 {self.max_size // (1024 * 1024)}MB)")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.cleanup_stale()
+
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'filename': filename, 'size': size, 'created_at': time.time()}, f, ensure_ascii=False)
+        self._hashers[upload_id] = (0, hashlib.sha256())
+        return {'upload_id': upload_id, 'offset': 0, 'chunk_size': UPLOAD_CHUNK_SIZE}
+
+    def status(self, upload_id):
+        """서버가 받은 바이트 수 (클라이언트는 여기서부터 이어서 전송)"""
+        meta = self._load(upload_id)
+        part_path, _ = self._paths(upload_id)
+        return {'upload_id': upload_id, 'filename': meta['filename'], 'offset': os.path.getsize(part_path),
+                'size': meta['size'], 'chunk_size': UPLOAD_CHUNK_SIZE}
+
+    def append(self, upload_id, offset, stream, length=None):
+        """
+        offset 위치에 청크 이어 쓰기 (스트림에서 읽는 즉시 파일과 해시에 반영)
+
+        연결이 중간에 끊겨도 이미 쓴 바이트는 유지되므로 status의 offset부터 이어서 보내면 됨
+
+        Returns:
+            int: 새 offset
+        """
+        with self._lock(upload_id):
+            meta = self._load(upload_id)
+            part_path, _ = self._paths(upload_id)
+            current = os.path.getsize(part_path)
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+
+            digest = self._hasher(upload_id, part_path)
+            remaining = meta['size'] - current
+            if length is not None and length > remaining:
+                raise UploadError("청크가 파일 크기를 넘습니다")
+
+            written = 0
+            try:
+                with open(part_path, 'ab') as f:
+                    while written < remaining:
+                        block = stream.read(min(READ_BLOCK, remaining - written))
+                        if not block:
+                            break
+                        f.write(block)
+                        digest.update(block)
+                        written += len(block)
+            finally:
+                self._hashers[upload_id] = (current + written, digest)
+            return current + written
+
+    def complete(self, upload_id, dest_path):
+        """
+        다 받은 파일을 dest_path로 이동
+
+        Returns:
+            dict: filename(원래 이름), size, sha256
+        """
+        with self._lock(upload_id):
+            meta = self._load(upload_id)
+            part_path, meta_path = self._paths(upload_id)
+            size = os.path.getsize(part_path)
+            if size != meta['size']:
+                raise UploadOffsetMismatch(size)
+
+            sha256 = self._hasher(upload_id, part_path).hexdigest()
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            os.replace(part_path, dest_path)
+            os.remove(meta_path)
+            self._hashers.pop(upload_id, None)
+        with self._guard:
+            self._locks.pop(upload_id, None)
+        return {'filename': meta['filename'], 'size': size, 'sha256': sha256}
+
+    def cleanup_stale(self):
+        """UPLOAD_PARTIAL_TTL보다 오래 갱신되지 않은 미완료 업로드 삭제"""
+        cutoff = time.time() - self.partial_ttl
+        for name in os.listdir(self.base_dir):
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.json':
+                continue
+            part_path, meta_path = self._paths(upload_id)
+            try:
+                # 마지막으로 청크를 받은 시각 기준
+                last_write = os.path.getmtime(part_path) if os.path.exists(part_path) else os.path.getmtime(meta_path)
+                if last_write < cutoff:
+                    for path in (part_path, meta_path):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    self._hashers.pop(upload_id, None)
+            except OSError:
+                pass
@@ -22,6 +22,13 @@ else:
 # === 기본 설정 ===
 INPUT_DIR = "input_videos"
 OUTPUT_BASE_DIR = "outputs"
+CACHE_DIR = os.getenv('CACHE_DIR', "cache")  # 번역 메모리 등 재사용 가능한 결과 저장 위치
+
+# === Whisper API 설정 ===
+WHISPER_API_MAX_MB = float(os.getenv('WHISPER_API_MAX_MB', '24'))  # 요청당 업로드 크기 (API 제한 25MB, 여유분 포함)
+WHISPER_API_CONCURRENCY = int(os.getenv('WHISPER_API_CONCURRENCY', '4'))  # 긴 오디오 분할 시 동시 요청 수
+WHISPER_API_AUDIO_CODEC = os.getenv('WHISPER_API_AUDIO_CODEC', 'opus')  # 업로드 오디오 형식: opus | mp3 | wav
+WHISPER_API_AUDIO_BITRATE = os.getenv('WHISPER_API_AUDIO_BITRATE', '24k')  # 압축 비트레이트 (음성 인식에는 16k~32k로 충분)
 
 # === 다국어 폰트 설정 ===
 import os
@@ -86,4 +93,119 @@ FONTS = TITLE_FONTS
 FONT_PATH = FONTS["default"]
 
 # === 번역 언어 목록 ===
-AVAILABLE_LANGUAGES = ["Korean", "English", "Spanish", "Vietnamese", "Japanese", "Chinese", "French", "German", "Thai"]
\ No newline at end of file
+AVAILABLE_LANGUAGES = ["Korean", "English", "Spanish", "Vietnamese", "Japanese", "Chinese", "French", "German", "Thai"]
+
+# === 번역 백엔드 설정 ===
+# claude: Anthropic HTTP API / stub: 네트워크 없이 동작하는 로컬 스텁 (부하 테스트, CI 벤치마크용)
+TRANSLATION_BACKEND = os.getenv('TRANSLATION_BACKEND', 'claude').lower()
+CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-3-haiku-20240307')
+
+# 스텁 백엔드 옵션
+STUB_TRANSLATION_MODE = os.getenv('STUB_TRANSLATION_MODE', 'pseudo').lower()  # echo / pseudo
+STUB_TRANSLATION_LATENCY = float(os.getenv('STUB_TRANSLATION_LATENCY', '0'))  # 호출당 지연 (초)
+STUB_TRANSLATION_ERROR_RATE = float(os.getenv('STUB_TRANSLATION_ERROR_RATE', '0'))  # 0.0 ~ 1.0
+STUB_TRANSLATION_SEED = int(os.getenv('STUB_TRANSLATION_SEED', '0'))
+
+# API 재시도 (429 / 5xx / 타임아웃)
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '2'))
+API_RETRY_BACKOFF = float(os.getenv('API_RETRY_BACKOFF', '1.0'))  # 초, 재시도마다 2배
+
+# 자막 번역 작업 (문장 × 언어) 동시 처리 워커 수
+TRANSLATION_WORKERS = int(os.getenv('TRANSLATION_WORKERS', '8'))
+
+# 지연(일괄) 번역 모드 - 배치 처리 시 모든 번역을 한 번의 일괄 작업으로 제출 (야간 백필용)
+DEFERRED_TRANSLATION = os.getenv('DEFERRED_TRANSLATION', 'false').lower() == 'true'
+DEFERRED_POLL_INTERVAL = float(os.getenv('DEFERRED_POLL_INTERVAL', '30'))  # 완료 확인 간격 (초)
+
+# === 번역 메모리 (유사 문장 재사용) ===
+TRANSLATION_MEMORY_ENABLED = os.getenv('TRANSLATION_MEMORY_ENABLED', 'true').lower() == 'true'
+TRANSLATION_MEMORY_PATH = os.getenv('TRANSLATION_MEMORY_PATH', os.path.join(CACHE_DIR, "translation_memory.jsonl"))
+# 이 이상이면 API 호출 없이 저장된 번역 재사용 (기본 1.0 = 정규화 후 완전히 같은 문장만 - 부정어/숫자 하나 차이도 유사도가 높게 나오므로)
+TRANSLATION_MEMORY_THRESHOLD = float(os.getenv('TRANSLATION_MEMORY_THRESHOLD', '1.0'))
+TRANSLATION_MEMORY_HINT_THRESHOLD = float(os.getenv('TRANSLATION_MEMORY_HINT_THRESHOLD', '0.6'))  # 이 이상이면 참고 번역으로 전달
+
+# === 업로드 직후 추측성 사전 처리 (음성 추출, 타이틀 번역) ===
+SPECULATIVE_ENABLED = os.getenv('SPECULATIVE_ENABLED', 'true').lower() == 'true'
+SPECULATIVE_WORKERS = int(os.getenv('SPECULATIVE_WORKERS', '1'))
+# 타겟 언어가 아직 선택되지 않았을 때 미리 번역해 둘 언어
+SPECULATIVE_TARGET_LANGUAGES = [lang.strip().lower() for lang in os.getenv('SPECULATIVE_TARGET_LANGUAGES', 'english,japanese,chinese').split(',') if lang.strip()]
+# 사용되지 않은 추측성 결과를 보관하는 시간 (초) - 지나면 취소/폐기
+SPECULATIVE_TTL = int(os.getenv('SPECULATIVE_TTL', '3600'))
+
+# === 로컬 Whisper 모델 관리 ===
+WHISPER_WARMUP_MODELS = [size.strip() for size in os.getenv('WHISPER_WARMUP_MODELS', '').split(',') if size.strip()]  # 시작 시 미리 로드할 모델 (예: "tiny,base")
+WHISPER_MODEL_IDLE_TTL = float(os.getenv('WHISPER_MODEL_IDLE_TTL', '900'))  # 이 시간(초) 동안 사용되지 않으면 모델 해제
+WHISPER_MIN_FREE_MEMORY_MB = int(os.getenv('WHISPER_MIN_FREE_MEMORY_MB', '500'))  # 가용 메모리가 이보다 적으면 유휴 모델 해제
+WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', '8'))  # 여러 영상의 음성 구간을 묶어 한 번에 디코딩할 개수 (1이면 영상별 처리)
+
+# === 음성 구간 검출 (VAD) - 무음/음악 구간을 건너뛰고 음성만 인식 ===
+VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+VAD_ENERGY_MARGIN_DB = float(os.getenv('VAD_ENERGY_MARGIN_DB', '12'))  # 배경 잡음 대비 이 이상 크면 음성 후보
+VAD_SPEECH_BAND_RATIO = float(os.getenv('VAD_SPEECH_BAND_RATIO', '0.5'))  # 300~3400Hz 대역 에너지 비율 하한 (음악 배제)
+VAD_MIN_SPEECH = float(os.getenv('VAD_MIN_SPEECH', '0.25'))  # 이보다 짧은 음성 구간은 무시 (초)
+VAD_MIN_SILENCE = float(os.getenv('VAD_MIN_SILENCE', '0.6'))  # 이보다 짧은 무음은 음성 구간에 포함 (초)
+VAD_PADDING = float(os.getenv('VAD_PADDING', '0.2'))  # 음성 구간 앞뒤 여유 (초)
+VAD_MIN_COVERAGE = float(os.getenv('VAD_MIN_COVERAGE', '0.3'))  # 소리가 있는 구간 중 음성으로 검출된 비율이 이보다 낮으면 검출을 믿지 않고 전체 오디오 사용
+
+# === 음성 인식 워커 프로세스 ===
+# 로컬 Whisper 추론을 웹 프로세스 밖의 워커 프로세스에서 실행 (0이면 웹 프로세스 안에서 실행)
+TRANSCRIPTION_WORKERS = int(os.getenv('TRANSCRIPTION_WORKERS', '1'))
+TRANSCRIPTION_CANCEL_GRACE = float(os.getenv('TRANSCRIPTION_CANCEL_GRACE', '30'))  # 취소한 작업이 이 시간(초) 안에 멈추지 않으면 워커 풀 전체를 종료
+
+# === 음성 인식 결과 교정 (Claude) ===
+CLAUDE_CORRECTION_CHUNK_LINES = int(os.getenv('CLAUDE_CORRECTION_CHUNK_LINES', '30'))  # 요청당 자막 줄 수
+CLAUDE_CORRECTION_WORKERS = int(os.getenv('CLAUDE_CORRECTION_WORKERS', '4'))  # 동시 요청 수
+CLAUDE_CORRECTION_MODEL = os.getenv('CLAUDE_CORRECTION_MODEL', CLAUDE_MODEL)  # 교정에 사용할 모델
+
+# === 음성 인식 경로 선택 (로컬 Whisper / Whisper API / 분할) ===
+TRANSCRIPTION_ROUTER = os.getenv('TRANSCRIPTION_ROUTER', 'auto')  # auto | local | api
+ROUTER_LOCAL_RTF = float(os.getenv('ROUTER_LOCAL_RTF', '0.5'))  # 로컬 인식 소요 시간 / 오디오 길이 (작업 하나 기준)
+ROUTER_API_RTF = float(os.getenv('ROUTER_API_RTF', '0.1'))  # API 인식 소요 시간 / 오디오 길이
+ROUTER_API_MAX_FAILURE_RATE = float(os.getenv('ROUTER_API_MAX_FAILURE_RATE', '0.5'))  # 최근 실패율이 이 이상이면 API 제외
+ROUTER_SPLIT_MIN_SECONDS = float(os.getenv('ROUTER_SPLIT_MIN_SECONDS', '600'))  # 이보다 긴 오디오는 로컬/API로 나누어 동시 처리
+
+# === 스트리밍 로컬 음성 인식 (긴 영상용, 메모리 사용량 일정) ===
+WHISPER_STREAMING = os.getenv('WHISPER_STREAMING', 'false').lower() == 'true'
+WHISPER_STREAM_WINDOW = float(os.getenv('WHISPER_STREAM_WINDOW', '30'))  # 한 번에 인식할 창 길이 (초)
+WHISPER_STREAM_OVERLAP = float(os.getenv('WHISPER_STREAM_OVERLAP', '5'))  # 창 사이 겹침 (초, 경계에서 잘린 문장 보완)
+
+# === 자막 구간 재분할 (음성 인식 후, 번역 전) ===
+CUE_RESEGMENT_ENABLED = os.getenv('CUE_RESEGMENT_ENABLED', 'true').lower() == 'true'
+CUE_MIN_DURATION = float(os.getenv('CUE_MIN_DURATION', '1.2'))  # 이보다 짧은 자막은 다음 자막과 합침 (초)
+CUE_MAX_DURATION = float(os.getenv('CUE_MAX_DURATION', '6.0'))  # 이보다 긴 자막은 나눔 (초)
+CUE_MIN_CHARS = int(os.getenv('CUE_MIN_CHARS', '6'))  # 이보다 짧은 자막은 다음 자막과 합침 (글자 수)
+CUE_MERGE_MAX_GAP = float(os.getenv('CUE_MERGE_MAX_GAP', '0.6'))  # 간격이 이보다 크면 합치지 않음 (초)
+CUE_FONT_SIZE = int(os.getenv('CUE_FONT_SIZE', '32'))  # 글자 수 한도 계산 기준 폰트 크기 (px)
+CUE_MAX_LINES = int(os.getenv('CUE_MAX_LINES', '2'))  # 자막 하나의 최대 줄 수
+
+# === 작업 큐 (SQLite, 재시작해도 유지) ===
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '1'))  # 동시에 처리할 작업 수
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))  # 실패 시 재시도 포함 최대 실행 횟수
+JOB_VISIBILITY_TIMEOUT = float(os.getenv('JOB_VISIBILITY_TIMEOUT', '600'))  # 이 시간(초) 동안 갱신 없는 실행 중 작업은 다시 대기열로
+JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '30'))  # 재시도 대기 시간 (초, 시도마다 배로 증가)
+
+# === 작업 취소 ===
+CANCEL_CHECK_FRAMES = int(os.getenv('CANCEL_CHECK_FRAMES', '30'))  # 비디오 생성 중 취소 확인 간격 (프레임)
+
+# === 분할 업로드 (이어받기) ===
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))  # 클라이언트가 한 번에 보내는 크기 (바이트)
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(1024 * 1024 * 1024)))  # 파일당 최대 크기 (바이트)
+UPLOAD_PARTIAL_TTL = float(os.getenv('UPLOAD_PARTIAL_TTL', '86400'))  # 완료되지 않은 업로드 보관 시간 (초)
+
+# === 내용 주소 미디어 저장소 ===
+MEDIA_STORE_DIR = os.getenv('MEDIA_STORE_DIR', 'web_media')  # 업로드 원본(내용 해시별)과 렌더링 결과 보관 위치
+
+# === 설정 화면용 미리보기 영상 ===
+PREVIEW_PROXY_ENABLED = os.getenv('PREVIEW_PROXY_ENABLED', 'true').lower() == 'true'
+PREVIEW_PROXY_HEIGHT = int(os.getenv('PREVIEW_PROXY_HEIGHT', '540'))  # 미리보기 세로 해상도 (원본이 더 작으면 유지)
+PREVIEW_PROXY_PRESET = os.getenv('PREVIEW_PROXY_PRESET', 'veryfast')  # x264 인코딩 속도 프리셋
+PREVIEW_PROXY_CRF = int(os.getenv('PREVIEW_PROXY_CRF', '28'))  # 화질 (클수록 작은 파일)
+PREVIEW_PROXY_MIN_MB = float(os.getenv('PREVIEW_PROXY_MIN_MB', '20'))  # 이보다 작은 원본은 그대로 사용
+PREVIEW_PROXY_WORKERS = int(os.getenv('PREVIEW_PROXY_WORKERS', '1'))  # 동시에 만들 미리보기 수
+PREVIEW_PROXY_TIMEOUT = float(os.getenv('PREVIEW_PROXY_TIMEOUT', '900'))  # 미리보기 인코딩 제한 시간 (초, 넘으면 중단하고 원본 사용)
+
+# === 처리 진행상황 ===
+PROGRESS_RETENTION = float(os.getenv('PROGRESS_RETENTION', '600'))  # 최종 상태가 된 진행상황을 메모리에 두는 시간 (초, 이후에는 저장 파일에서 조회)
+PROGRESS_STREAM_MAX_SECONDS = float(os.getenv('PROGRESS_STREAM_MAX_SECONDS', '60'))  # SSE 연결 하나를 유지하는 최대 시간 (초, 이후 브라우저가 Last-Event-ID로 재연결)
+PROGRESS_STREAM_MAX_CONNECTIONS = int(os.getenv('PROGRESS_STREAM_MAX_CONNECTIONS', '4'))  # 동시 SSE 연결 수 (초과하면 503 - 브라우저는 폴링으로 전환)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+자막 구간 재분할
+음성 인식 결과의 너무 짧은 자막은 합치고, 자막 영역에 들어가지 않을 만큼 긴 자막은 나눠
+번역 API 호출 수와 자막 렌더링 횟수를 줄이고 글자 크기가 지나치게 작아지지 않도록 함
+"""
+
+import re
+from datetime import timedelta
+
+import srt
+from PIL import ImageFont
+
+from config import (
+    CUE_MIN_DURATION, CUE_MAX_DURATION, CUE_MIN_CHARS, CUE_MERGE_MAX_GAP, CUE_FONT_SIZE, CUE_MAX_LINES
+)
+
+SAMPLE_TEXT = "가나다라마바사아자차카타파하 abcdefghij"
+_SENTENCE_END = re.compile(r'(?<=[.!?。！？,，])\s+')
+
+
+def max_chars_for_width(region_width, font_path, font_size=CUE_FONT_SIZE, max_lines=CUE_MAX_LINES, margin_x=20):
+    """
+    자막 영역 폭(px)과 폰트로 자막 하나에 담을 수 있는 최대 글자 수 추정
+    (render_subtitle_text와 같은 좌우 여백 기준)
+    """
+    try:
+        font = ImageFont.truetype(font_path, font_size)
+        char_width = font.getlength(SAMPLE_TEXT) / len(SAMPLE_TEXT)
+    except (OSError, AttributeError):
+        char_width = font_size * 0.8
+    chars_per_line = max(4, int((region_width - margin_x * 2) / max(char_width, 1)))
+    return chars_per_line * max_lines
+
+
+def _split_text(text, max_chars):
+    """문장 경계 → 띄어쓰기 → 글자 순으로 max_chars 이하 조각으로 나눔"""
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        words = sentence.split(' ') if len(sentence) > max_chars else [sentence]
+        current = ""
+        for word in words:
+            while len(word) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(word[:max_chars])
+                word = word[max_chars:]
+            candidate = f"{current} {word}" if current else word
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                pieces.append(current)
+                current = word
+        if current:
+            pieces.append(current)
+
+    # 문장 단위로 나눈 짧은 조각은 한도 안에서 다시 합침
+    merged = []
+    for piece in pieces:
+        if merged and len(merged[-1]) + 1 + len(piece) <= max_chars:
+            merged[-1] = f"{merged[-1]} {piece}"
+        else:
+            merged.append(piece)
+    return merged
+
+
+def _split_cue(start, end, text, max_chars, max_duration):
+    """긴 자막을 글자 수 비율로 시간을 나눠 여러 자막으로 분할"""
+    pieces = _split_text(text, max_chars)
+    duration = end - start
+    # 글자 수는 맞아도 너무 긴 자막은 조각 수를 늘림
+    while duration / len(pieces) > max_duration and any(' ' in piece for piece in pieces):
+        longest = max(range(len(pieces)), key=lambda i: len(pieces[i]))
+        words = pieces[longest].split(' ')
+        if len(words) < 2:
+            break
+        half = len(words) // 2
+        pieces[longest:longest + 1] = [' '.join(words[:half]), ' '.join(words[half:])]
+
+    total_chars = sum(len(piece) for piece in pieces)
+    cues = []
+    position = start
+    for piece in pieces:
+        piece_end = position + duration * len(piece) / total_chars
+        cues.append((position, piece_end, piece))
+        position = piece_end
+    return cues
+
+
+def resegment_cues(subs, max_chars, min_duration=CUE_MIN_DURATION, max_duration=CUE_MAX_DURATION,
+                   min_chars=CUE_MIN_CHARS, max_gap=CUE_MERGE_MAX_GAP):
+    """
+    자막 목록 재분할 (긴 자막 분할 → 짧은 자막 병합)
+
+    Returns:
+        list: 번호를 다시 매긴 srt.Subtitle 목록
+    """
+    cues = []
+    for sub in subs:
+        text = ' '.join(sub.content.split())
+        if not text:
+            continue
+        start, end = sub.start.total_seconds(), sub.end.total_seconds()
+        if len(text) > max_chars or end - start > max_duration:
+            cues.extend(_split_cue(start, end, text, max_chars, max_duration))
+        else:
+            cues.append((start, end, text))
+
+    merged = []
+    for start, end, text in cues:
+        if merged:
+            prev_start, prev_end, prev_text = merged[-1]
+            prev_short = prev_end - prev_start < min_duration or len(prev_text) < min_chars
+            current_short = end - start < min_duration or len(text) < min_chars
+            fits = (len(prev_text) + 1 + len(text) <= max_chars and end - prev_start <= max_duration
+                    and start - prev_end <= max_gap)
+            if (prev_short or current_short) and fits:
+                merged[-1] = (prev_start, end, f"{prev_text} {text}")
+                continue
+        merged.append((start, end, text))
+
+    return [
+        srt.Subtitle(index=i + 1, start=timedelta(seconds=start), end=timedelta(seconds=end), content=text)
+        for i, (start, end, text) in enumerate(merged)
+    ]
+
+
+def resegment_srt_file(srt_path, region_width, font_path):
+    """SRT 파일의 자막 구간을 자막 영역 폭 기준으로 재분할해 덮어씀"""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        subs = list(srt.parse(f.read()))
+
+    max_chars = max_chars_for_width(region_width, font_path)
+    resegmented = resegment_cues(subs, max_chars)
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        f.write(srt.compose(resegmented))
+
+    print(f"✂️  자막 구간 재분할: {len(subs)}개 → {len(resegmented)}개 (자막당 최대 {max_chars}자)")
+    return srt_path
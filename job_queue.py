@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+SQLite 기반 영구 작업 큐와 워커 풀
+작업 상태(queued / running / succeeded / failed / cancelled), 재시도, 임대(visibility timeout)를 관리
+실행 중 프로세스가 죽어도 임대가 만료되면 다른 워커(또는 재시작한 프로세스)가 작업을 다시 가져감
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from cancellation import cancellation_registry, OperationCancelled
+from config import JOB_QUEUE_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_VISIBILITY_TIMEOUT, JOB_RETRY_BACKOFF
+
+TERMINAL_STATES = ('succeeded', 'failed', 'cancelled')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+"""
+
+
+class JobQueue:
+    def __init__(self, db_path=JOB_QUEUE_PATH, visibility_timeout=JOB_VISIBILITY_TIMEOUT,
+                 max_attempts=JOB_MAX_ATTEMPTS, retry_backoff=JOB_RETRY_BACKOFF):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결을 열고 끝나면 닫음 (예외 시 열린 트랜잭션은 롤백)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def enqueue(self, kind, payload, job_id=None, max_attempts=None):
+        """
+        작업 추가 (같은 job_id가 대기/실행 중이면 그대로 두고, 끝난 작업이면 다시 대기열로)
+
+        Returns:
+            str: 작업 ID
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if existing is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, payload, status, max_attempts, available_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload, ensure_ascii=False), max_attempts or self.max_attempts,
+                     now, now, now))
+            elif existing['status'] in TERMINAL_STATES:
+                conn.execute(
+                    "UPDATE jobs SET kind = ?, payload = ?, status = 'queued', attempts = 0, available_at = ?, "
+                    "lease_until = NULL, worker = NULL, error = NULL, updated_at = ? WHERE id = ?",
+                    (kind, json.dumps(payload, ensure_ascii=False), now, now, job_id))
+            conn.execute("COMMIT")
+        return job_id
+
+    def claim(self, worker_id):
+        """
+        실행할 작업 하나를 임대 (대기 중이거나 임대가 만료된 실행 중 작업)
+
+        임대가 만료된 작업 중 시도 횟수를 다 쓴 작업은 같은 트랜잭션에서 failed로 처리
+        (워커 프로세스가 죽어 fail()을 거치지 못한 작업이 끝없이 다시 실행되지 않도록)
+
+        Returns:
+            tuple: (임대한 작업 또는 None, 이번에 failed로 바뀐 작업 목록)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            exhausted = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now,)).fetchall()
+            exhausted = [self._to_dict(job) for job in exhausted]
+            for job in exhausted:
+                job.update(status='failed', lease_until=None, error="임대 만료 (워커가 응답 없이 종료됨)", updated_at=now)
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', lease_until = NULL, error = ?, updated_at = ? WHERE id = ?",
+                    (job['error'], now, job['id']))
+
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_until < ? AND attempts < max_attempts) ORDER BY created_at LIMIT 1",
+                (now, now)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None, exhausted
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, worker = ?, "
+                "updated_at = ? WHERE id = ?",
+                (now + self.visibility_timeout, worker_id, now, row['id']))
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+            conn.execute("COMMIT")
+        return self._to_dict(job), exhausted
+
+    def heartbeat(self, job_id, worker_id):
+        """임대 연장 (다른 워커가 가져갔거나 취소되었으면 False)"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now + self.visibility_timeout, now, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'succeeded', lease_until = NULL, error = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker_id))
+
+    def fail(self, job_id, worker_id, error):
+        """실패 기록 - 남은 시도가 있으면 대기 후 재시도, 없으면 failed"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            job = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'running'",
+                               (job_id, worker_id)).fetchone()
+            if job is not None:
+                if job['attempts'] < job['max_attempts']:
+                    delay = self.retry_backoff * (2 ** (job['attempts'] - 1))
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', available_at = ?, lease_until = NULL, error = ?, "
+                        "updated_at = ? WHERE id = ?", (now + delay, str(error), now, job_id))
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', lease_until = NULL, error = ?, updated_at = ? WHERE id = ?",
+                        (str(error), now, job_id))
+            conn.execute("COMMIT")
+
+    def cancel(self, job_id):
+        """끝나지 않은 작업 취소 (취소했으면 True)"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), job_id))
+            return cursor.rowcount == 1
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def position(self, job_id):
+        """대기열에서 앞에 있는 작업 수 (대기 중이 아니면 None)"""
+        with self._connect() as conn:
+            job = conn.execute("SELECT status, created_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None or job['status'] != 'queued':
+                return None
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?",
+                                (job['created_at'],)).fetchone()[0]
+
+    def stats(self):
+        """상태별 작업 수"""
+        with self._connect() as conn:
+            return {row['status']: row['count'] for row in
+                    conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+
+
+class JobWorkerPool:
+    def __init__(self, queue, handlers, workers=JOB_WORKERS, poll_interval=1.0, on_abandoned=None):
+        """
+        Args:
+            handlers (dict): 작업 종류 → 처리 함수(job_id, payload, attempt, max_attempts), 예외가 나면 재시도 대상
+            on_abandoned (callable): on_abandoned(job) - 임대 만료 후 시도 횟수를 다 써서 failed 처리된 작업마다 호출
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.on_abandoned = on_abandoned
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        """워커 스레드 시작 (메인 프로세스에서만, 이미 시작했으면 무시)"""
+        if self._threads or self.workers <= 0 or multiprocessing.parent_process() is not None:
+            return
+        for i in range(self.workers):
+            worker_id = f"{os.getpid()}-{i}-{uuid.uuid4().hex[:6]}"
+            thread = threading.Thread(target=self._run, args=(worker_id,), daemon=True, name=f"job-worker-{i}")
+            thread.start()
+            self._threads.append(thread)
+        print(f"🧵 작업 워커 {self.workers}개 시작 (큐: {self.queue.db_path})")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                job, abandoned = self.queue.claim(worker_id)
+            except sqlite3.Error as e:
+                print(f"⚠️ 작업 큐 조회 실패: {e}")
+                job, abandoned = None, []
+            for dead in abandoned:
+                print(f"❌ 작업 실패 (임대 만료, {dead['attempts']}/{dead['max_attempts']}회차): {dead['id']}")
+                if self.on_abandoned:
+                    try:
+                        self.on_abandoned(dead)
+                    except Exception as e:
+                        print(f"⚠️ 실패 처리 콜백 오류: {dead['id']} - {e}")
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self._execute(worker_id, job)
+
+    def _execute(self, worker_id, job):
+        print(f"▶️ 작업 시작: {job['id']} ({job['kind']}, {job['attempts']}/{job['max_attempts']}회차)")
+        done = threading.Event()
+
+        with cancellation_registry.scope(job['id']) as token:
+            def keep_lease():
+                while not done.wait(self.queue.visibility_timeout / 3):
+                    try:
+                        alive = self.queue.heartbeat(job['id'], worker_id)
+                    except sqlite3.Error as e:
+                        # 일시적인 DB 오류(잠김 등)로 하트비트 스레드가 죽으면 임대가 만료되어 중복 실행되므로 계속 시도
+                        print(f"⚠️ 임대 연장 실패: {job['id']} - {e}")
+                        continue
+                    if not alive:
+                        # 다른 프로세스에서 취소했거나 임대가 넘어간 작업은 중단
+                        token.cancel()
+                        break
+
+            heartbeat = threading.Thread(target=keep_lease, daemon=True)
+            heartbeat.start()
+            try:
+                handler = self.handlers[job['kind']]
+                handler(job['id'], job['payload'], job['attempts'], job['max_attempts'])
+            except OperationCancelled:
+                print(f"🛑 작업 중단됨: {job['id']}")
+            except Exception as e:
+                print(f"❌ 작업 실패: {job['id']} - {e}")
+                self.queue.fail(job['id'], worker_id, e)
+            else:
+                self.queue.complete(job['id'], worker_id)
+                print(f"✅ 작업 완료: {job['id']}")
+            finally:
+                done.set()
+
+job_queue = JobQueue()
@@ -1,4 +1,10 @@
 import os
+import json
+import time
+import hashlib
+import shutil
+import tempfile
+import contextvars
 import cv2
 import srt
 import numpy as np
@@ -6,13 +12,25 @@ import requests
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 from tkinter import Tk, Label, Button, Checkbutton, IntVar
-from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from tqdm import tqdm
 from color_selector import select_background_colors
 
 
 from config import CLAUDE_API_KEY, OPENAI_API_KEY, INPUT_DIR, OUTPUT_BASE_DIR, FONT_PATH, FONTS, TITLE_FONTS, SUBTITLE_FONTS, AVAILABLE_LANGUAGES
+from config import DEFERRED_TRANSLATION, DEFERRED_POLL_INTERVAL, API_MAX_RETRIES, API_RETRY_BACKOFF, WHISPER_API_MAX_MB, WHISPER_API_CONCURRENCY, VAD_ENABLED
+from config import WHISPER_API_AUDIO_CODEC, WHISPER_API_AUDIO_BITRATE, CUE_RESEGMENT_ENABLED
+from translation_backend import get_translation_backend, TranslationError
+from cancellation import raise_if_cancelled, frame_checkpoint, cancellable_sleep
+from translation_memory import get_translation_memory
+from task_scheduler import CueTaskScheduler
+from api_metrics import metrics, job_context
+from audio_cache import file_content_hash, extract_audio, extract_speech_audio, compress_audio, encoded_bytes_per_second, load_pcm, write_wav, SAMPLE_RATE
+from audio_vad import find_split_points, remap_time
+from transcript_cache import transcript_cache, transcript_key, segments_from_srt
+from cue_resegmentation import resegment_srt_file
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 
 os.makedirs(INPUT_DIR, exist_ok=True)
@@ -587,6 +605,18 @@ def translate_title(title_text, target_languages):
 
 # === [6] Whisper로 원문 자막 추출 ===
 def transcribe_video(video_path, output_dir):
+    return save_transcript(transcribe_source_api(video_path), output_dir)
+
+def transcribe_source_api(video_path):
+    """Whisper API로 음성 인식 후 SRT 문자열 반환 (원본 영상 시간 기준)"""
+    # 같은 영상/설정으로 인식한 결과가 있으면 음성 인식 생략
+    cache_key = transcript_key(file_content_hash(video_path), "openai", "whisper-1", "ko",
+                               codec=WHISPER_API_AUDIO_CODEC, bitrate=WHISPER_API_AUDIO_BITRATE)
+    cached = transcript_cache.get(cache_key)
+    if cached is not None:
+        print("♻️  음성 인식 캐시 사용 - Whisper API 호출 생략")
+        return cached['srt']
+    
     # Whisper API 지원 형식 확인 및 변환
     supported_formats = ['.flac', '.m4a', '.mp3', '.mp4', '.mpeg', '.mpga', '.oga', '.ogg', '.wav', '.webm']
     file_ext = os.path.splitext(video_path)[1].lower()
@@ -596,28 +626,11 @@ def transcribe_video(video_path, output_dir):
         print(f"⚠️  {file_ext} 형식은 Whisper API에서 지원되지 않습니다.")
         print("💡 오디오를 WAV 형식으로 추출하여 처리합니다...")
     
-    # 비디오에서 오디오 추출
-    print("비디오에서 오디오 추출 중...")
-    audio_path = os.path.join(output_dir, "temp_audio.wav")
-    
-    # OpenCV를 사용해서 오디오 추출 시도
+    # 비디오에서 오디오 추출 (내용 해시 기준 캐시 - 재실행/재시도 시 추출 생략)
     try:
-        import subprocess
-        # 시스템에 ffmpeg가 있는지 확인
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        
-        # ffmpeg로 오디오 추출
-        result = subprocess.run([
-            'ffmpeg', '-i', video_path, '-vn', '-acodec', 'pcm_s16le', 
-            '-ar', '16000', '-ac', '1', audio_path, '-y'
-        ], capture_output=True, text=True, timeout=300)
-        
-        if result.returncode != 0:
-            raise Exception("ffmpeg 오디오 추출 실패")
-        else:
-            print("✅ 오디오 추출 완료!")
+        audio_path = extract_audio(video_path)
             
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
         print("❌ ffmpeg를 찾을 수 없습니다.")
         
         # 지원되는 형식이면 원본 파일 직접 사용
@@ -648,12 +661,56 @@ def transcribe_video(video_path, output_dir):
         else:
             raise Exception(f"오디오 추출에 실패했고, {file_ext} 형식은 직접 지원되지 않습니다.")
     
-    # 파일 크기 체크
-    file_size = os.path.getsize(audio_path) / (1024 * 1024)  # MB
-    if file_size > 25:
-        raise Exception(f"파일 크기가 {file_size:.1f}MB로 Whisper API 제한(25MB)을 초과합니다. 파일을 압축하거나 짧게 나누어 주세요.")
+    # 음성 구간만 인식 (무음/음악 구간을 건너뛰고, 결과 시간은 원본 기준으로 복원)
+    timeline = None
+    if VAD_ENABLED and audio_path != video_path:
+        audio_path, timeline = extract_speech_audio(video_path)
     
+    # 업로드 크기 체크 (압축 코덱 기준 예상 크기) - 제한을 넘으면 무음 지점에서 나누어 동시 인식
+    if audio_path == video_path:
+        file_size = os.path.getsize(audio_path) / (1024 * 1024)  # MB
+        if file_size > WHISPER_API_MAX_MB:
+            raise Exception(f"파일 크기가 {file_size:.1f}MB로 Whisper API 제한(25MB)을 초과합니다. 파일을 압축하거나 짧게 나누어 주세요.")
+    else:
+        duration = os.path.getsize(audio_path) / (SAMPLE_RATE * 2)
+        file_size = duration * encoded_bytes_per_second(WHISPER_API_AUDIO_CODEC, WHISPER_API_AUDIO_BITRATE) / (1024 * 1024)
+    
+    try:
+        if timeline == []:
+            print("🔇 음성 구간이 없어 인식을 건너뜁니다.")
+            transcript = ""
+        elif file_size > WHISPER_API_MAX_MB:
+            print(f"📦 업로드 예상 크기 {file_size:.1f}MB - 무음 구간 기준으로 분할하여 인식합니다...")
+            transcript = transcribe_chunked_api(audio_path)
+        elif audio_path == video_path:
+            transcript = transcribe_file_api(audio_path)
+        else:
+            transcript = transcribe_file_api(api_upload_audio(audio_path))
+        
+        if timeline:
+            transcript = remap_transcript(transcript, timeline)
+        
+        # 원본 오디오를 추출해 인식한 경우에만 캐시 (VAD/코덱 설정이 키와 일치)
+        if audio_path != video_path:
+            transcript_cache.put(cache_key, segments_from_srt(transcript), transcript,
+                                 source=os.path.basename(video_path))
+        
+        return transcript
+    except Exception as e:
+        raise Exception(f"Whisper API 오류: {str(e)}. 오디오 형식을 확인하거나 파일을 다른 형식으로 변환해주세요.")
+
+
+def resegment_transcript(srt_path, subtitle_region):
+    """번역 전 자막 구간 재분할 - 자막 영역 폭에 맞게 짧은 자막은 합치고 긴 자막은 나눔"""
+    if CUE_RESEGMENT_ENABLED and subtitle_region:
+        resegment_srt_file(srt_path, subtitle_region[2] - subtitle_region[0], get_subtitle_font_for_language("korean"))
+    return srt_path
+
+def transcribe_file_api(audio_path):
+    """Whisper API 단일 요청 (SRT 문자열 반환)"""
+    raise_if_cancelled()
     client = OpenAI(api_key=OPENAI_API_KEY)
+    started = time.time()
     try:
         with open(audio_path, "rb") as f:
             transcript = client.audio.transcriptions.create(
@@ -662,158 +719,151 @@ def transcribe_video(video_path, output_dir):
                 response_format="srt",
                 language="ko"
             )
+    except Exception as api_error:
+        metrics.record("openai", "transcribe", time.time() - started, error=api_error)
+        raise
+    metrics.record("openai", "transcribe", time.time() - started, status=200)
+    return transcript
+
+def save_transcript(transcript, output_dir):
+    """인식 결과 SRT에서 크레딧 텍스트를 걸러 원본 자막(SRT/TXT)으로 저장"""
+    # 원본 자막을 output 폴더에 저장
+    srt_path = os.path.join(output_dir, "original_korean.srt")
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(transcript)
+    
+    # 텍스트만 추출해서 별도 저장
+    import srt
+    subs = list(srt.parse(transcript))
+    
+    # 불필요한 크레딧 텍스트 필터링
+    filtered_subs = []
+    for sub in subs:
+        # UpTitle 크레딧이나 기타 불필요한 텍스트 제거
+        content = sub.content.strip()
+        if any(keyword in content.lower() for keyword in [
+            'uptitle', 'http', 'www', '.co.kr', '.com', 
+            '자막제작', 'by ', 'subtitle', 'caption'
+        ]):
+            print(f"🚫 필터링된 크레딧 텍스트: '{content}'")
+            continue
         
-        # 임시 오디오 파일 삭제
-        if audio_path != video_path and os.path.exists(audio_path):
-            os.remove(audio_path)
-        
-        # 원본 자막을 output 폴더에 저장
-        srt_path = os.path.join(output_dir, "original_korean.srt")
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(transcript)
-        
-        # 텍스트만 추출해서 별도 저장
-        import srt
-        subs = list(srt.parse(transcript))
-        
-        # 불필요한 크레딧 텍스트 필터링
-        filtered_subs = []
-        for sub in subs:
-            # UpTitle 크레딧이나 기타 불필요한 텍스트 제거
-            content = sub.content.strip()
-            if any(keyword in content.lower() for keyword in [
-                'uptitle', 'http', 'www', '.co.kr', '.com', 
-                '자막제작', 'by ', 'subtitle', 'caption'
-            ]):
-                print(f"🚫 필터링된 크레딧 텍스트: '{content}'")
-                continue
+        # 빈 내용이나 너무 짧은 텍스트 제거
+        if len(content) < 2:
+            continue
             
-            # 빈 내용이나 너무 짧은 텍스트 제거
-            if len(content) < 2:
-                continue
-                
-            filtered_subs.append(sub)
-        
-        # 필터링된 자막으로 SRT 파일 다시 생성
-        filtered_transcript = srt.compose(filtered_subs)
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(filtered_transcript)
-        
-        # 필터링된 텍스트 내용 저장
-        text_content = "\n".join([sub.content for sub in filtered_subs])
-        
-        txt_path = os.path.join(output_dir, "original_korean.txt")
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(text_content)
-        
-        print(f"✅ 자막 추출 완료 ({len(filtered_subs)}개 문장, 크레딧 필터링 적용)")
-        
-        return srt_path
+        filtered_subs.append(sub)
+    
+    # 필터링된 자막으로 SRT 파일 다시 생성
+    filtered_transcript = srt.compose(filtered_subs)
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(filtered_transcript)
+    
+    # 필터링된 텍스트 내용 저장
+    text_content = "\n".join([sub.content for sub in filtered_subs])
+    
+    txt_path = os.path.join(output_dir, "original_korean.txt")
+    with open(txt_path, "w", encoding="utf-8") as f:
+        f.write(text_content)
+    
+    print(f"✅ 자막 추출 완료 ({len(filtered_subs)}개 문장, 크레딧 필터링 적용)")
+    
+    return srt_path
+
+def api_upload_audio(wav_path):
+    """Whisper API 업로드용 오디오 - 설정된 코덱으로 압축 (실패 시 WAV 그대로)"""
+    if WHISPER_API_AUDIO_CODEC == "wav":
+        return wav_path
+    try:
+        upload_path = compress_audio(wav_path, WHISPER_API_AUDIO_CODEC, WHISPER_API_AUDIO_BITRATE)
+        print(f"🗜️  업로드 오디오 압축: {os.path.getsize(wav_path) / (1024 * 1024):.1f}MB → "
+              f"{os.path.getsize(upload_path) / (1024 * 1024):.1f}MB ({WHISPER_API_AUDIO_CODEC} {WHISPER_API_AUDIO_BITRATE})")
+        return upload_path
     except Exception as e:
-        # 임시 파일 정리
-        if audio_path != video_path and os.path.exists(audio_path):
-            os.remove(audio_path)
-        raise Exception(f"Whisper API 오류: {str(e)}. 오디오 형식을 확인하거나 파일을 다른 형식으로 변환해주세요.")
+        print(f"⚠️  오디오 압축 실패, WAV로 업로드합니다: {e}")
+        return wav_path
+
+def remap_transcript(transcript, timeline):
+    """음성 구간만 인식한 SRT의 시간을 원본 영상 시간축으로 변환"""
+    subs = list(srt.parse(transcript))
+    for sub in subs:
+        sub.start = timedelta(seconds=remap_time(sub.start.total_seconds(), timeline))
+        sub.end = timedelta(seconds=remap_time(sub.end.total_seconds(), timeline))
+    return srt.compose(subs)
+
+def transcribe_chunked_api(wav_path):
+    """
+    크기 제한을 넘는 WAV를 무음 지점에서 나누어 동시에 인식한 뒤 하나의 SRT로 병합
+    
+    각 청크의 자막 시간에 청크 시작 시각을 더하고 번호를 다시 매김
+    """
+    pcm = load_pcm(wav_path)
+    bytes_per_second = encoded_bytes_per_second(WHISPER_API_AUDIO_CODEC, WHISPER_API_AUDIO_BITRATE)
+    max_chunk_seconds = WHISPER_API_MAX_MB * 1024 * 1024 / bytes_per_second
+    boundaries = [0] + find_split_points(pcm, max_chunk_seconds) + [len(pcm)]
+    
+    chunk_dir = tempfile.mkdtemp(prefix="whisper_chunks_")
+    try:
+        chunks = []
+        for i, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+            chunk_path = os.path.join(chunk_dir, f"chunk_{i:03d}.wav")
+            write_wav(chunk_path, pcm[start:end])
+            chunks.append((chunk_path, start / SAMPLE_RATE))
+        print(f"   {len(chunks)}개 청크로 분할 (청크당 최대 {max_chunk_seconds / 60:.1f}분)")
+        
+        with ThreadPoolExecutor(max_workers=WHISPER_API_CONCURRENCY) as executor:
+            # 청크마다 컨텍스트를 복사해 작업 ID/취소 토큰을 전달
+            futures = [executor.submit(contextvars.copy_context().run,
+                                       lambda path: transcribe_file_api(api_upload_audio(path)), path)
+                       for path, _ in chunks]
+            transcripts = [future.result() for future in futures]
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    merged = []
+    for transcript, (_, offset) in zip(transcripts, chunks):
+        shift = timedelta(seconds=offset)
+        for sub in srt.parse(transcript):
+            sub.start += shift
+            sub.end += shift
+            merged.append(sub)
+    return srt.compose(merged)
 
 
 # === [4] Claude API 번역 ===
 def translate_title_claude(text, target_lang, source_lang="Korean"):
     """타이틀 전용 번역 - 짧고 임팩트 있게"""
-    url = "https://api.anthropic.com/v1/messages"
-    headers = {
-        "x-api-key": CLAUDE_API_KEY,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-    payload = {
-        "model": "claude-3-haiku-20240307",
-        "max_tokens": 1000,
-        "messages": [
-            {"role": "user", "content": f"Translate this {source_lang} video title to {target_lang}. Make it SHORT, CATCHY and suitable for a video title. Keep it under 6 words if possible. Do NOT transliterate - translate the meaning. Provide only the translated title:\n{text}"}
-        ]
-    }
-    
     try:
-        res = requests.post(url, json=payload, headers=headers)
-        data = res.json()
-        
-        # API 응답 구조 확인
-        if "content" in data and len(data["content"]) > 0:
-            translated_text = data["content"][0]["text"].strip()
-            
-            # Claude의 설명 텍스트 제거
-            lines = translated_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and not line.lower().startswith(('the translation', 'here is', 'the korean text', 'translated to', 'translation:')):
-                    # 따옴표로 감싸진 텍스트면 따옴표 제거
-                    if line.startswith('"') and line.endswith('"'):
-                        return line[1:-1]
-                    else:
-                        return line
-            
-            # 만약 위 조건에 맞는 라인이 없으면 전체 텍스트 반환
-            return translated_text
-        elif "error" in data:
-            print(f"Claude API 오류: {data['error']}")
-            return f"[번역 실패: {target_lang}] {text}"
-        else:
-            print(f"예상치 못한 응답 구조: {data}")
-            return f"[번역 실패: {target_lang}] {text}"
-            
-    except Exception as e:
-        print(f"번역 요청 오류: {e}")
+        return get_translation_backend().translate(text, target_lang, source_lang, kind="title")
+    except TranslationError as e:
+        print(e)
         return f"[번역 실패: {target_lang}] {text}"
 
 def translate_subtitle_claude(text, target_lang, source_lang="Korean"):
     """자막 전용 번역 - 자연스럽고 구어체로"""
     print(f"  🌍 자막 번역 시작: '{text}' ({source_lang} -> {target_lang})")
     
-    url = "https://api.anthropic.com/v1/messages"
-    headers = {
-        "x-api-key": CLAUDE_API_KEY,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-    payload = {
-        "model": "claude-3-haiku-20240307",
-        "max_tokens": 1000,
-        "messages": [
-            {"role": "user", "content": f"Translate this {source_lang} video subtitle to natural, conversational {target_lang}. Make it sound like how people actually speak in videos - casual and natural. Do NOT transliterate pronunciation - translate the meaning. Provide only the translated subtitle:\n{text}"}
-        ]
-    }
+    # 번역 메모리에서 유사 문장 검색 (임계값 이상이면 재사용, 미만이면 참고 번역으로 전달)
+    memory = get_translation_memory()
+    hint = None
+    if memory is not None:
+        match = memory.lookup(text, target_lang, source_lang)
+        if match:
+            translated, similarity, stored_source = match
+            if similarity >= memory.threshold:
+                print(f"  📚 번역 메모리 재사용 (유사도 {similarity:.2f}): '{stored_source}'")
+                return translated
+            hint = (stored_source, translated)
     
     try:
-        res = requests.post(url, json=payload, headers=headers)
-        data = res.json()
-        
-        # API 응답 구조 확인
-        if "content" in data and len(data["content"]) > 0:
-            translated_text = data["content"][0]["text"].strip()
-            
-            # Claude의 설명 텍스트 제거
-            lines = translated_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and not line.lower().startswith(('the translation', 'here is', 'the korean text', 'translated to', 'translation:')):
-                    # 따옴표로 감싸진 텍스트면 따옴표 제거
-                    if line.startswith('"') and line.endswith('"'):
-                        return line[1:-1]
-                    else:
-                        return line
-            
-            # 만약 위 조건에 맞는 라인이 없으면 전체 텍스트 반환
-            return translated_text
-        elif "error" in data:
-            print(f"Claude API 오류: {data['error']}")
-            return f"[번역 실패: {target_lang}] {text}"
-        else:
-            print(f"예상치 못한 응답 구조: {data}")
-            return f"[번역 실패: {target_lang}] {text}"
-            
-    except Exception as e:
+        translated = get_translation_backend().translate(text, target_lang, source_lang, kind="subtitle", hint=hint)
+    except TranslationError as e:
         print(f"자막 번역 요청 오류: {e}")
         return f"[번역 실패: {target_lang}] {text}"
+    
+    if memory is not None:
+        memory.add(text, target_lang, translated, source_lang)
+    return translated
 
 # 하위 호환성을 위한 기존 함수 (자막 번역으로 리다이렉트)
 def translate_text_claude(text, target_lang):
@@ -826,33 +876,116 @@ def create_translations_parallel(srt_file, languages, output_dir):
     with open(srt_file, "r", encoding="utf-8") as f:
         subs = list(srt.parse(f.read()))
 
-    translations = {lang: [] for lang in languages}
+    # 모든 (문장, 언어) 쌍을 공용 워커 풀에서 처리 - 느린 언어가 전체를 막지 않도록
+    scheduler = CueTaskScheduler(lambda sub, lang: translate_text_claude(sub.content, lang))
+    results = scheduler.run(subs, languages)
 
-    def translate_for_lang(lang):
-        lang_translations = []
-        lang_timing_data = []
-        
-        for sub in tqdm(subs, desc=f"번역 중 ({lang})", unit="문장"):
-            translated = translate_text_claude(sub.content, lang)
-            lang_timing_data.append((sub.start.total_seconds(), sub.end.total_seconds(), translated))
-            lang_translations.append(translated)
+    translations = {}
+    for lang in languages:
+        lang_translations = results[lang]
+        translations[lang] = [
+            (sub.start.total_seconds(), sub.end.total_seconds(), translated)
+            for sub, translated in zip(subs, lang_translations)
+        ]
         
         # 각 언어별 번역 텍스트 저장
         txt_path = os.path.join(output_dir, f"translated_{lang}.txt")
         with open(txt_path, "w", encoding="utf-8") as f:
             f.write("\n".join(lang_translations))
-        
-        return lang, lang_timing_data
-
-    # 병렬 처리 후 결과 수집
-    with ThreadPoolExecutor(max_workers=len(languages)) as executor:
-        results = executor.map(translate_for_lang, languages)
-        for lang, timing_data in results:
-            translations[lang] = timing_data
 
     return translations
 
 
+# === [5-2] 지연(일괄) 번역 ===
+def _load_deferred_state(state_path, backend, signature):
+    """같은 백엔드/같은 번역 단위로 제출했던 일괄 작업 ID 반환 (없으면 None)"""
+    if not state_path or not backend.bulk_resumable or not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  일괄 작업 상태 파일 읽기 실패: {e}")
+        return None
+    if state.get('backend') != backend.name or state.get('signature') != signature:
+        return None
+    return state.get('job_id')
+
+
+def translate_units_deferred(units, state_path=None):
+    """
+    번역 단위를 한 번의 일괄 작업으로 제출하고 완료될 때까지 대기
+
+    Args:
+        units (list): {'id', 'text', 'target_lang', 'source_lang', 'kind'} 딕셔너리 목록
+        state_path (str): 일괄 작업 ID 저장 경로 - 중단 후 재실행하면 다시 제출하지 않고 이어서 대기
+
+    Returns:
+        dict: {단위 ID: 번역 (실패시 None)}
+    """
+    memory = get_translation_memory()
+    results = {}
+    pending = []
+    
+    # 번역 메모리에서 재사용 가능한 자막은 제출하지 않음
+    for unit in units:
+        if memory is not None and unit['kind'] == 'subtitle':
+            match = memory.lookup(unit['text'], unit['target_lang'], unit['source_lang'])
+            if match and match[1] >= memory.threshold:
+                results[unit['id']] = match[0]
+                continue
+        pending.append(unit)
+    
+    print(f"📦 일괄 번역 제출: {len(pending)}개 단위 (번역 메모리 재사용 {len(results)}개)")
+    if not pending:
+        return results
+    
+    backend = get_translation_backend()
+    signature = hashlib.sha256(json.dumps(
+        [(u['id'], u['text'], u['target_lang'], u['source_lang'], u['kind']) for u in pending],
+        ensure_ascii=False).encode("utf-8")).hexdigest()
+    job_id = _load_deferred_state(state_path, backend, signature)
+    if job_id:
+        print(f"  🔁 이전에 제출한 일괄 작업을 이어서 확인합니다: {job_id}")
+    else:
+        job_id = backend.submit_bulk(pending)
+        if state_path and backend.bulk_resumable:
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump({'backend': backend.name, 'signature': signature, 'job_id': job_id}, f)
+    print(f"  ⏳ 일괄 작업 ID: {job_id} - 완료까지 {DEFERRED_POLL_INTERVAL:.0f}초 간격으로 확인합니다")
+    
+    # 일시적인 확인 실패는 백오프 후 계속 대기 (연속 실패가 한도를 넘으면 중단 - 재실행 시 이어서 확인)
+    started = time.time()
+    failures = 0
+    while True:
+        try:
+            if backend.poll_bulk(job_id) == 'ended':
+                break
+            failures = 0
+            cancellable_sleep(DEFERRED_POLL_INTERVAL)
+        except TranslationError as e:
+            failures += 1
+            if failures > API_MAX_RETRIES:
+                raise
+            print(f"  ⚠️  일괄 작업 상태 확인 실패 ({failures}/{API_MAX_RETRIES}): {e}")
+            cancellable_sleep(max(DEFERRED_POLL_INTERVAL, API_RETRY_BACKOFF * (2 ** failures)))
+    print(f"  ✅ 일괄 번역 완료 ({time.time() - started:.0f}초)")
+    
+    bulk_results = backend.fetch_bulk(job_id)
+    if state_path and os.path.exists(state_path):
+        os.remove(state_path)
+    for unit in pending:
+        translated = bulk_results.get(unit['id'])
+        if translated is not None and memory is not None and unit['kind'] == 'subtitle':
+            memory.add(unit['text'], unit['target_lang'], translated, unit['source_lang'])
+        results[unit['id']] = translated
+    
+    failed = sum(1 for unit in pending if results[unit['id']] is None)
+    if failed:
+        print(f"  ⚠️  일괄 번역 실패 단위: {failed}개")
+    return results
+
+
 # === [8] 영상 처리 + 타이틀 + 자막 ===
 def generate_video(video_path, translations, lang, subtitle_region, output_dir, title_region=None, title_translations=None):
     cap = cv2.VideoCapture(video_path)
@@ -886,6 +1019,7 @@ def generate_video(video_path, translations, lang, subtitle_region, output_dir,
     pbar = tqdm(total=total_frames, desc=f"{lang} 영상 처리", unit="프레임")
 
     while True:
+        frame_checkpoint(frame_idx)
         ret, frame = cap.read()
         if not ret:
             break
@@ -1014,7 +1148,7 @@ def process_single_video(video_path, regions_data, selected_languages, video_ind
 
     # 음성 인식 (자막 추출)
     print("🎙️  음성 인식 (자막 추출)...")
-    srt_path = transcribe_video(video_path, output_dir)
+    srt_path = resegment_transcript(transcribe_video(video_path, output_dir), subtitle_coords)
 
     # 자막 번역 (병렬 처리)
     print("🌍 자막 번역 (병렬 처리)...")
@@ -1037,6 +1171,88 @@ def process_single_video(video_path, regions_data, selected_languages, video_ind
     print(f"✅ [{video_index}/{total_videos}] {os.path.basename(video_path)} 처리 완료!")
     return output_dir
 
+def process_batch_deferred(video_paths, regions_data, selected_languages):
+    """지연 번역 모드: 모든 영상 음성 인식 → 번역 일괄 제출/대기 → 영상 생성"""
+    total_videos = len(video_paths)
+    prepared = []
+    units = []
+    
+    # 1) 음성 인식 + 번역 단위 수집
+    for video_index, video_path in enumerate(video_paths, 1):
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_dir = os.path.join(OUTPUT_BASE_DIR, f"{video_name}_translated")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        print(f"\n🎙️  [{video_index}/{total_videos}] {os.path.basename(video_path)} 음성 인식...")
+        try:
+            title_text = extract_title_from_filename(video_path)
+            srt_path = resegment_transcript(transcribe_video(video_path, output_dir),
+                                            regions_data[video_path]['subtitle_region'])
+            with open(srt_path, "r", encoding="utf-8") as f:
+                subs = list(srt.parse(f.read()))
+        except Exception as e:
+            print(f"❌ {os.path.basename(video_path)} 음성 인식 실패: {e}")
+            continue
+        
+        for lang_index, lang in enumerate(selected_languages):
+            units.append({'id': f"v{video_index}-t-l{lang_index}", 'text': title_text,
+                          'target_lang': lang, 'source_lang': "Korean", 'kind': 'title'})
+            for sub_index, sub in enumerate(subs):
+                units.append({'id': f"v{video_index}-s{sub_index}-l{lang_index}", 'text': sub.content,
+                              'target_lang': lang, 'source_lang': "Korean", 'kind': 'subtitle'})
+        prepared.append((video_index, video_path, output_dir, title_text, subs))
+    
+    # 2) 일괄 번역
+    results = translate_units_deferred(units, state_path=os.path.join(OUTPUT_BASE_DIR, "deferred_batch.json"))
+    
+    # 3) 결과 조립 + 영상 생성
+    completed_videos = []
+    for video_index, video_path, output_dir, title_text, subs in prepared:
+        try:
+            title_translations = {}
+            translations_dict = {}
+            for lang_index, lang in enumerate(selected_languages):
+                # 실패시 원문 사용 (translate_title과 동일)
+                title_translations[lang] = results.get(f"v{video_index}-t-l{lang_index}") or title_text
+                
+                lang_translations = []
+                for sub_index, sub in enumerate(subs):
+                    translated = results.get(f"v{video_index}-s{sub_index}-l{lang_index}")
+                    lang_translations.append(translated if translated is not None else f"[번역 실패: {lang}] {sub.content}")
+                translations_dict[lang] = [
+                    (sub.start.total_seconds(), sub.end.total_seconds(), translated)
+                    for sub, translated in zip(subs, lang_translations)
+                ]
+                
+                txt_path = os.path.join(output_dir, f"translated_{lang}.txt")
+                with open(txt_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(lang_translations))
+            
+            title_file = os.path.join(output_dir, "title_translations.txt")
+            with open(title_file, "w", encoding="utf-8") as f:
+                f.write(f"원본 타이틀: {title_text}\n\n")
+                for lang, translated in title_translations.items():
+                    f.write(f"{lang}: {translated}\n")
+            
+            regions = regions_data[video_path]
+            print(f"\n🎬 [{video_index}/{total_videos}] {os.path.basename(video_path)} 영상 생성...")
+            for lang in selected_languages:
+                print(f"  🎥 {lang} 영상 생성 중...")
+                generate_video(
+                    video_path=video_path,
+                    translations=translations_dict[lang],
+                    lang=lang,
+                    subtitle_region=regions['subtitle_region'],
+                    output_dir=output_dir,
+                    title_region=regions['title_region'],
+                    title_translations=title_translations
+                )
+            completed_videos.append((video_path, output_dir))
+        except Exception as e:
+            print(f"❌ {os.path.basename(video_path)} 처리 실패: {e}")
+    
+    return completed_videos
+
 def process_batch_videos():
     """배치 처리 메인 함수"""
     print("🎬 비디오 자동 번역기 v3.0 (배치 처리)")
@@ -1067,13 +1283,21 @@ def process_batch_videos():
     completed_videos = []
     total_videos = len(video_paths)
     
-    for i, video_path in enumerate(video_paths, 1):
-        try:
-            output_dir = process_single_video(video_path, regions_data, selected_languages, i, total_videos)
-            completed_videos.append((video_path, output_dir))
-        except Exception as e:
-            print(f"❌ {os.path.basename(video_path)} 처리 실패: {e}")
-            continue
+    if DEFERRED_TRANSLATION:
+        # 지연 모드: 대기 시간보다 처리량/비용 우선 (야간 백필용)
+        print("📦 지연(일괄) 번역 모드로 실행합니다.")
+        completed_videos = process_batch_deferred(video_paths, regions_data, selected_languages)
+    else:
+        for i, video_path in enumerate(video_paths, 1):
+            job_id = os.path.basename(video_path)
+            try:
+                with job_context(job_id):
+                    output_dir = process_single_video(video_path, regions_data, selected_languages, i, total_videos)
+                completed_videos.append((video_path, output_dir))
+                metrics.print_summary(job_id)
+            except Exception as e:
+                print(f"❌ {os.path.basename(video_path)} 처리 실패: {e}")
+                continue
     
     # 최종 결과 요약
     print("\n" + "=" * 60)
@@ -1083,6 +1307,8 @@ def process_batch_videos():
     for video_path, output_dir in completed_videos:
         video_name = os.path.basename(video_path)
         print(f"   • {video_name} → {output_dir}")
+    print()
+    metrics.print_summary()
 
 def process_single_mode():
     """단일 파일 처리 모드 (기존 방식)"""
@@ -1125,7 +1351,7 @@ def process_single_mode():
         title_translations = None
 
     print("\n[6/8] 음성 인식 (자막 추출)")
-    srt_path = transcribe_video(input_video_path, output_dir)
+    srt_path = resegment_transcript(transcribe_video(input_video_path, output_dir), subtitle_coords)
 
     print("\n[7/8] 자막 번역 (병렬 처리)")
     translations_dict = create_translations_parallel(srt_path, selected_languages, output_dir)
@@ -1149,6 +1375,8 @@ def process_single_mode():
     print(f"   • 타이틀 번역: title_translations.txt")
     print(f"   • 번역 텍스트: translated_[언어].txt")
     print(f"   • 최종 영상: [언어소문자]_[번역된타이틀].mp4")
+    print()
+    metrics.print_summary()
 
 # === 실행 ===
 if __name__ == "__main__":
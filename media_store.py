@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+내용 주소(content-addressed) 미디어 저장소
+업로드 원본은 SHA-256으로 한 번만 보관하고, 렌더링 결과 같은 파생 결과물은 원본 해시 + 생성 파라미터로 저장
+같은 영상을 여러 세션에서 올려도 저장/계산을 다시 하지 않음
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from config import MEDIA_STORE_DIR
+from audio_cache import file_content_hash, remember_content_hash
+
+
+def params_key(params):
+    """파라미터 dict를 짧은 해시로 (키 순서와 무관)"""
+    encoded = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def _link_or_copy(src_path, dest_path):
+    """같은 파일시스템이면 하드 링크(추가 공간 없음), 아니면 복사"""
+    tmp_path = f"{dest_path}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+class MediaStore:
+    def __init__(self, root=MEDIA_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def object_path(self, sha256, ext):
+        return os.path.join(self.root, 'objects', sha256[:2], f"{sha256}{ext.lower()}")
+
+    def ingest(self, src_path, original_filename, sha256=None):
+        """
+        업로드 파일을 저장소로 이동 (같은 내용이 이미 있으면 src_path를 지우고 기존 파일 사용)
+
+        Returns:
+            tuple: (저장소 내 경로, sha256)
+        """
+        sha256 = sha256 or file_content_hash(src_path)
+        dest_path = self.object_path(sha256, os.path.splitext(original_filename)[1])
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+        with self._lock:
+            if os.path.exists(dest_path):
+                os.remove(src_path)
+                print(f"♻️  이미 저장된 영상 재사용: {original_filename} ({sha256[:12]})")
+            else:
+                shutil.move(src_path, dest_path)
+        remember_content_hash(dest_path, sha256)
+        return dest_path, sha256
+
+    def artifact_path(self, kind, sha256, params, ext):
+        return os.path.join(self.root, 'artifacts', kind, sha256[:2], f"{sha256}_{params_key(params)}{ext}")
+
+    def find_artifact(self, kind, sha256, params, ext):
+        """저장된 파생 결과물 경로 (없으면 None)"""
+        path = self.artifact_path(kind, sha256, params, ext)
+        return path if os.path.exists(path) else None
+
+    def save_artifact(self, src_path, kind, sha256, params, ext):
+        """생성한 결과물을 저장소에 등록 (src_path는 그대로 둠)"""
+        path = self.artifact_path(kind, sha256, params, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _link_or_copy(src_path, path)
+        return path
+
+    def export(self, artifact_path, dest_path):
+        """저장된 결과물을 세션 출력 폴더로 꺼냄"""
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        _link_or_copy(artifact_path, dest_path)
+        return dest_path
+
+
+media_store = MediaStore()
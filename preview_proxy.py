@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+설정 화면용 저해상도 미리보기 영상 생성
+업로드 직후 백그라운드에서 540p/faststart MP4를 만들어 두고, 완성 전까지는 원본을 그대로 제공
+결과는 미디어 저장소에 원본 해시 + 인코딩 설정으로 저장되어 세션 간에 공유
+"""
+
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    PREVIEW_PROXY_ENABLED, PREVIEW_PROXY_HEIGHT, PREVIEW_PROXY_PRESET, PREVIEW_PROXY_CRF,
+    PREVIEW_PROXY_MIN_MB, PREVIEW_PROXY_WORKERS, PREVIEW_PROXY_TIMEOUT
+)
+from cancellation import run_process
+from media_store import media_store
+
+
+def proxy_params():
+    return {'height': PREVIEW_PROXY_HEIGHT, 'preset': PREVIEW_PROXY_PRESET, 'crf': PREVIEW_PROXY_CRF}
+
+
+class PreviewProxyManager:
+    def __init__(self, max_workers=PREVIEW_PROXY_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preview-proxy")
+        self._pending = {}  # 원본 해시 → Future
+        self._lock = threading.Lock()
+
+    def get(self, sha256):
+        """완성된 미리보기 경로 (없거나 아직 만드는 중이면 None)"""
+        return media_store.find_artifact('preview', sha256, proxy_params(), '.mp4')
+
+    def schedule(self, video_path, sha256):
+        """미리보기 생성 예약 (이미 있거나 만드는 중이거나 원본이 충분히 작으면 무시)"""
+        if not PREVIEW_PROXY_ENABLED or self.get(sha256):
+            return None
+        if os.path.getsize(video_path) < PREVIEW_PROXY_MIN_MB * 1024 * 1024:
+            return None
+        with self._lock:
+            future = self._pending.get(sha256)
+            if future is None or future.done():
+                future = self._pending[sha256] = self._executor.submit(self._build, video_path, sha256)
+            return future
+
+    def _build(self, video_path, sha256):
+        proxy_path = media_store.artifact_path('preview', sha256, proxy_params(), '.mp4')
+        os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+        tmp_path = f"{proxy_path}.{threading.get_ident()}.tmp.mp4"
+        print(f"🎞️ 미리보기 영상 생성 시작: {os.path.basename(video_path)}")
+        try:
+            # 손상된 업로드 등으로 ffmpeg가 멈추면 제한 시간 후 종료 (작업 취소 시에도 바로 종료)
+            result = run_process([
+                'ffmpeg', '-nostdin', '-y', '-i', video_path,
+                '-map', '0:v:0', '-map', '0:a:0?',
+                # 세로 PREVIEW_PROXY_HEIGHT 이하로 축소 (원본이 더 작으면 그대로), 가로는 짝수로 맞춤
+                '-vf', f"scale=-2:'min({PREVIEW_PROXY_HEIGHT},ih)'",
+                '-c:v', 'libx264', '-preset', PREVIEW_PROXY_PRESET, '-crf', str(PREVIEW_PROXY_CRF),
+                '-pix_fmt', 'yuv420p',
+                '-c:a', 'aac', '-b:a', '64k', '-ac', '2',
+                # 메타데이터를 앞으로 옮겨 다운로드가 끝나기 전에 재생 시작
+                '-movflags', '+faststart',
+                tmp_path
+            ], timeout=PREVIEW_PROXY_TIMEOUT, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise Exception(f"ffmpeg 미리보기 생성 실패: {result.stderr[-500:]}")
+            os.replace(tmp_path, proxy_path)
+            print(f"✅ 미리보기 영상 생성 완료: {os.path.getsize(video_path) / (1024 * 1024):.1f}MB → "
+                  f"{os.path.getsize(proxy_path) / (1024 * 1024):.1f}MB")
+            return proxy_path
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ 미리보기 영상 생성 시간 초과 ({PREVIEW_PROXY_TIMEOUT:.0f}초), 원본을 사용합니다")
+            return None
+        except Exception as e:
+            print(f"⚠️ 미리보기 영상 생성 실패, 원본을 사용합니다: {e}")
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self._lock:
+                self._pending.pop(sha256, None)
+
+
+preview_proxies = PreviewProxyManager()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+세션별 처리 진행상황 저장소 (메모리, 버전 관리)
+갱신마다 버전을 올리고 대기 중인 구독자(SSE)를 깨움
+완료/오류/취소 같은 최종 상태만 파일로 남겨 재시작 후에도 조회 가능
+"""
+
+import copy
+import json
+import os
+import threading
+import uuid
+
+from config import PROGRESS_RETENTION
+
+FINAL_STATES = ('completed', 'error', 'cancelled')
+
+
+def merge_patch(old, new):
+    """
+    old → new 변경분 (JSON Merge Patch, RFC 7386 형식)
+
+    dict는 재귀적으로 비교하고 목록/값은 바뀌었으면 통째로 포함, 삭제된 키는 None
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch(old[key], value) if isinstance(value, dict) else value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+class ProgressStore:
+    def __init__(self, persist_dir='static/temp', retention=PROGRESS_RETENTION):
+        self.persist_dir = persist_dir
+        self.retention = retention
+        self.boot_id = uuid.uuid4().hex[:8]  # 재시작 후 ETag/이벤트 ID가 겹치지 않도록
+        self._entries = {}  # session_id → (버전, 진행상황)
+        self._cond = threading.Condition()
+
+    def _path(self, session_id):
+        return os.path.join(self.persist_dir, f'progress_{session_id}.json')
+
+    def set(self, session_id, data):
+        """진행상황 교체 (호출 후 data를 계속 수정해도 저장된 값에는 영향 없음)"""
+        snapshot = copy.deepcopy(data)
+        with self._cond:
+            version = self._entries.get(session_id, (0, None))[0] + 1
+            self._entries[session_id] = (version, snapshot)
+            self._cond.notify_all()
+
+        path = self._path(session_id)
+        if snapshot.get('status') not in FINAL_STATES:
+            # 다시 처리를 시작했으면 이전 실행의 최종 상태 파일은 더 이상 유효하지 않음
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        else:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+            # 최종 상태는 파일에 남았으므로 구독자가 마지막 이벤트를 받을 시간만 두고 메모리에서 제거
+            timer = threading.Timer(self.retention, self.discard, args=(session_id, version))
+            timer.daemon = True
+            timer.start()
+        return version
+
+    def get(self, session_id):
+        """
+        현재 진행상황
+
+        Returns:
+            tuple: (버전, 진행상황) - 메모리에 없으면 저장된 최종 상태(버전 0), 그것도 없으면 (0, None)
+        """
+        with self._cond:
+            entry = self._entries.get(session_id)
+        if entry is not None:
+            return entry
+
+        path = self._path(session_id)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return 0, json.load(f)
+        return 0, None
+
+    def wait(self, session_id, after_version, timeout):
+        """버전이 after_version보다 커질 때까지 최대 timeout초 대기 후 (버전, 진행상황) 반환"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._entries.get(session_id, (0, None))[0] > after_version, timeout=timeout)
+        return self.get(session_id)
+
+    def etag(self, session_id, version):
+        return f"{self.boot_id}-{session_id}-{version}"
+
+    def discard(self, session_id, version=None):
+        """메모리에서 제거 (version을 주면 그 사이 갱신되지 않은 경우에만)"""
+        with self._cond:
+            entry = self._entries.get(session_id)
+            if entry is not None and (version is None or entry[0] == version):
+                del self._entries[session_id]
+
+
+progress_store = ProgressStore()
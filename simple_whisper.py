@@ -5,11 +5,31 @@
 """
 
 import os
+import contextvars
+import hashlib
+import json
 import whisper
 import srt
 from datetime import timedelta
 import ssl
+import subprocess
 import urllib.request
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cancellation import raise_if_cancelled, current_token
+from whisper_registry import model_registry
+from audio_cache import file_content_hash, extract_audio, load_pcm, SAMPLE_RATE
+from audio_vad import detect_speech_segments, build_speech_audio, remap_time, split_windows
+from config import VAD_ENABLED, WHISPER_BATCH_SIZE, CACHE_DIR, CLAUDE_CORRECTION_CHUNK_LINES, CLAUDE_CORRECTION_WORKERS
+from config import CLAUDE_CORRECTION_MODEL as CORRECTION_MODEL
+from config import WHISPER_STREAMING, WHISPER_STREAM_WINDOW, WHISPER_STREAM_OVERLAP
+from translation_backend import ClaudeBackend, TranslationError, parse_numbered_lines
+from transcript_cache import transcript_cache, transcript_key
+
+CORRECTION_CACHE_DIR = os.path.join(CACHE_DIR, "corrections")
 
 # SSL 인증서 문제 해결
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -18,6 +38,143 @@ ssl._create_default_https_context = ssl._create_unverified_context
 if '/opt/homebrew/bin' not in os.environ.get('PATH', ''):
     os.environ['PATH'] = '/opt/homebrew/bin:' + os.environ.get('PATH', '')
 
+def transcribe_local(video_path, model_size):
+    """로컬 Whisper 모델로 음성 인식 (VAD 적용 시 음성 구간만 인식 후 원본 시간으로 복원)"""
+    # 캐시된 16kHz PCM 사용 (Whisper가 원본 영상을 다시 디코딩하지 않도록)
+    audio = load_pcm(extract_audio(video_path))
+    
+    # 음성 구간만 인식 (무음/음악 구간 제외, 결과 시간은 원본 기준으로 복원)
+    timeline = None
+    if VAD_ENABLED:
+        segments = detect_speech_segments(audio)
+        total_seconds = len(audio) / SAMPLE_RATE
+        audio, timeline = build_speech_audio(audio, segments)
+        print(f"🔇 Speech segments: {len(segments)} ({len(audio) / SAMPLE_RATE:.1f}s of {total_seconds:.1f}s)")
+    
+    if timeline == []:
+        print("🔇 No speech detected, skipping transcription")
+        return {'segments': []}
+    
+    with model_registry.use(model_size) as model:
+        # 음성 추출
+        print(f"🔍 Transcribing: {os.path.basename(video_path)}")
+        result = model.transcribe(
+            audio,
+            language='ko',  # 한국어로 설정
+            verbose=True,
+            fp16=False,  # CPU 호환성을 위해 False로 설정
+            task='transcribe',
+            temperature=0.0  # 더 안정적인 결과
+        )
+    
+    if timeline:
+        for segment in result['segments']:
+            segment['start'] = remap_time(segment['start'], timeline)
+            segment['end'] = remap_time(segment['end'], timeline)
+    return result
+
+def stream_transcribe(video_path, model_size="base", window_seconds=WHISPER_STREAM_WINDOW, overlap_seconds=WHISPER_STREAM_OVERLAP):
+    """
+    ffmpeg 파이프로 PCM을 창 단위로 읽어 인식하고 자막을 하나씩 내보내는 제너레이터
+    
+    메모리에는 창 하나 분량만 유지 (영상 길이와 무관)
+    창 끝 겹침 구간에서 시작한 문장은 다음 창에서 전체 문맥으로 다시 인식하고,
+    이미 내보낸 구간과 겹치는 문장은 건너뜀
+    
+    Yields:
+        srt.Subtitle: 원본 영상 시간 기준 자막
+    """
+    step_seconds = window_seconds - overlap_seconds
+    window_samples = int(window_seconds * SAMPLE_RATE)
+    step_samples = int(step_seconds * SAMPLE_RATE)
+    
+    process = subprocess.Popen(
+        ['ffmpeg', '-nostdin', '-loglevel', 'error', '-i', video_path,
+         '-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-ac', '1', 'pipe:1'],
+        stdout=subprocess.PIPE
+    )
+    buffer = np.zeros(0, dtype=np.float32)
+    window_start = 0.0    # buffer 첫 샘플의 원본 시각
+    committed_until = 0.0  # 마지막으로 내보낸 자막의 끝 시각
+    index = 1
+    token = current_token()
+    try:
+        # 작업이 취소되면 ffmpeg를 바로 종료하고, 창마다 취소 확인
+        with token.track_process(process) if token is not None else nullcontext():
+            finished = False
+            while not finished:
+                # 창 하나가 찰 때까지 읽기
+                needed = window_samples - len(buffer)
+                data = process.stdout.read(needed * 2) if needed > 0 else b''
+                finished = needed > 0 and len(data) < needed * 2
+                if data:
+                    chunk = np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+                    buffer = np.concatenate([buffer, chunk])
+                if len(buffer) == 0:
+                    break
+                # 취소로 ffmpeg가 종료되어 읽기가 짧게 끝난 경우 남은 창을 인식하지 않도록 여기서 확인
+                raise_if_cancelled()
+            
+                if not VAD_ENABLED or detect_speech_segments(buffer):
+                    with model_registry.use(model_size) as model:
+                        result = model.transcribe(
+                            buffer,
+                            language='ko',
+                            fp16=False,
+                            task='transcribe',
+                            temperature=0.0,
+                            condition_on_previous_text=False  # 창마다 독립적으로 인식 (이전 창 오류 전파 방지)
+                        )
+                    for segment in result['segments']:
+                        start = window_start + segment['start']
+                        end = window_start + segment['end']
+                        text = segment['text'].strip()
+                        # 겹침 구간에서 시작한 문장은 다음 창에서 처리 (마지막 창 제외)
+                        if not finished and segment['start'] >= step_seconds:
+                            continue
+                        # 이전 창에서 이미 내보낸 문장
+                        if end <= committed_until + 0.1 or start < committed_until - 0.5 or not text:
+                            continue
+                        yield srt.Subtitle(index=index, start=timedelta(seconds=max(start, committed_until)),
+                                           end=timedelta(seconds=end), content=text)
+                        index += 1
+                        committed_until = end
+            
+                buffer = buffer[step_samples:]
+                window_start += step_seconds
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+def transcribe_local_streaming(video_path, output_dir, model_size):
+    """스트리밍 인식 - 자막이 나오는 대로 SRT 파일에 추가 (진행 중에도 부분 결과 확인 가능)"""
+    base_name = os.path.splitext(os.path.basename(video_path))[0]
+    srt_path = os.path.join(output_dir, f"{base_name}_korean.srt")
+    
+    print(f"🔍 Streaming transcription: {os.path.basename(video_path)}")
+    segments = []
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        for subtitle in stream_transcribe(video_path, model_size):
+            f.write(subtitle.to_srt())
+            f.flush()
+            segments.append({'start': subtitle.start.total_seconds(), 'end': subtitle.end.total_seconds(),
+                             'text': subtitle.content})
+    return {'segments': segments}
+
+def compose_srt(segments):
+    """구간 목록 → SRT 문자열"""
+    subtitles = []
+    for i, segment in enumerate(segments):
+        subtitle = srt.Subtitle(
+            index=i + 1,
+            start=timedelta(seconds=segment['start']),
+            end=timedelta(seconds=segment['end']),
+            content=segment['text'].strip()
+        )
+        subtitles.append(subtitle)
+    return srt.compose(subtitles)
+
 def extract_audio_with_whisper(video_path, output_dir, model_size="tiny"):
     """
     Whisper를 사용해 비디오에서 음성을 추출하고 SRT 파일로 저장
@@ -33,8 +190,7 @@ def extract_audio_with_whisper(video_path, output_dir, model_size="tiny"):
     print(f"🎤 Starting Whisper transcription with {model_size} model...")
     
     try:
-        # Whisper 모델 로드 (처음에는 다운로드 시간이 걸림)
-        print(f"📥 Loading Whisper {model_size} model...")
+        # Whisper 모델 로드 (프로세스당 한 번, 처음에는 다운로드 시간이 걸림)
         print(f"💾 Available memory check...")
         
         try:
@@ -49,19 +205,20 @@ def extract_audio_with_whisper(video_path, output_dir, model_size="tiny"):
             print("⚠️ psutil not available, using tiny model as safe default")
             model_size = 'tiny'
             
-        model = whisper.load_model(model_size)
-        print(f"✅ Model {model_size} loaded successfully")
-        
-        # 음성 추출
-        print(f"🔍 Transcribing: {os.path.basename(video_path)}")
-        result = model.transcribe(
-            video_path,
-            language='ko',  # 한국어로 설정
-            verbose=True,
-            fp16=False,  # CPU 호환성을 위해 False로 설정
-            task='transcribe',
-            temperature=0.0  # 더 안정적인 결과
-        )
+        # 같은 영상/모델로 인식한 결과가 있으면 재사용
+        backend = "local-stream" if WHISPER_STREAMING else "local"
+        cache_key = transcript_key(file_content_hash(video_path), backend, model_size, "ko")
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached transcript ({model_size})")
+            result = {'segments': cached['segments']}
+        elif WHISPER_STREAMING:
+            result = transcribe_local_streaming(video_path, output_dir, model_size)
+            transcript_cache.put(cache_key, result['segments'], compose_srt(result['segments']), source=os.path.basename(video_path))
+        else:
+            result = transcribe_local(video_path, model_size)
+            segments = [{'start': float(seg['start']), 'end': float(seg['end']), 'text': seg['text']} for seg in result['segments']]
+            transcript_cache.put(cache_key, segments, compose_srt(segments), source=os.path.basename(video_path))
         print(f"🎯 Transcription completed: {len(result.get('segments', []))} segments")
     except FileNotFoundError as e:
         if 'ffmpeg' in str(e):
@@ -96,46 +253,142 @@ ffmpeg를 설치한 후 다시 시도해주세요.
         else:
             raise e
     
-    # SRT 형식으로 변환
-    subtitles = []
-    for i, segment in enumerate(result['segments']):
-        subtitle = srt.Subtitle(
-            index=i + 1,
-            start=timedelta(seconds=segment['start']),
-            end=timedelta(seconds=segment['end']),
-            content=segment['text'].strip()
-        )
-        subtitles.append(subtitle)
-    
     # SRT 파일 저장
     base_name = os.path.splitext(os.path.basename(video_path))[0]
     srt_path = os.path.join(output_dir, f"{base_name}_korean.srt")
     
     with open(srt_path, 'w', encoding='utf-8') as f:
-        f.write(srt.compose(subtitles))
+        f.write(compose_srt(result['segments']))
     
     print(f"✅ SRT file saved: {srt_path}")
-    print(f"📊 Total segments: {len(subtitles)}")
+    print(f"📊 Total segments: {len(result['segments'])}")
     
     return srt_path
 
-def improve_text_with_claude(text, api_key):
-    """Claude API를 사용하여 Whisper 텍스트의 오타와 인식 오류를 수정"""
-    import requests
+def _timestamped_segments(tokens, tokenizer, window_seconds):
+    """
+    타임스탬프 토큰으로 디코딩 결과를 구간으로 나눔 (시간은 창 시작 기준 초)
+    
+    끝 타임스탬프 없이 끝난 마지막 문장은 창 끝까지 이어지는 것으로 처리 (transcribe()와 동일)
+    
+    Returns:
+        list: [(시작, 끝, 텍스트)]
+    """
+    segments = []
+    start, text_tokens = None, []
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text_tokens.append(token)
+            continue
+        seconds = (token - tokenizer.timestamp_begin) * 0.02
+        if start is not None and text_tokens:
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append((start, seconds, text))
+            start, text_tokens = None, []
+        else:
+            start = seconds
+    text = tokenizer.decode(text_tokens).strip() if text_tokens else ""
+    if text:
+        segments.append((start or 0.0, window_seconds, text))
+    return segments
+
+def _needs_fallback(decoded, sample_len):
+    """
+    transcribe()의 온도 재시도 기준과 같은 품질 검사 + 토큰 한도 도달 여부
+    (실패하면 창을 단독으로 다시 인식)
+    """
+    return (len(decoded.tokens) >= sample_len
+            or decoded.compression_ratio > 2.4 or decoded.avg_logprob < -1.0)
+
+def extract_audio_with_whisper_batch(video_paths, output_dir, model_size="base", batch_size=WHISPER_BATCH_SIZE):
+    """
+    여러 영상을 묶어 배치 추론으로 음성 인식하고 영상별 SRT 파일로 저장
+    
+    각 영상의 음성 구간(30초 이하 창)마다 log-mel을 계산해 batch_size개씩 한 번에 디코딩하고,
+    타임스탬프 토큰 기준으로 문장 구간을 나눠 원본 시간으로 옮김
+    품질 검사에 실패하거나 토큰 한도로 잘린 창은 transcribe()로 다시 인식 (온도 재시도 포함)
     
-    print("🧠 Claude API로 텍스트 정확도 개선 중...")
+    Returns:
+        list: 입력 순서대로 생성된 SRT 파일 경로
+    """
+    import torch
+    
+    results = {}   # 영상 순번 → 구간 목록
+    windows = []   # (영상 순번, 시작 초, 끝 초, PCM)
+    cache_keys = {}  # 새로 인식한 영상 순번 → 캐시 키
+    for video_idx, video_path in enumerate(video_paths):
+        cache_key = transcript_key(file_content_hash(video_path), "local-batched", model_size, "ko")
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            print(f"♻️  Using cached transcript: {os.path.basename(video_path)}")
+            results[video_idx] = cached['segments']
+            continue
+        
+        audio = load_pcm(extract_audio(video_path))
+        total_seconds = len(audio) / SAMPLE_RATE
+        speech = detect_speech_segments(audio) if VAD_ENABLED else [(0.0, total_seconds)]
+        for start_sec, end_sec in split_windows(speech):
+            windows.append((video_idx, start_sec, end_sec, audio[int(start_sec * SAMPLE_RATE):int(end_sec * SAMPLE_RATE)]))
+        results[video_idx] = []
+        cache_keys[video_idx] = cache_key
+    
+    if windows:
+        print(f"🔍 Batch transcribing {len(windows)} windows from {len(video_paths)} videos (batch size {batch_size})")
+        options = whisper.DecodingOptions(language='ko', without_timestamps=False, fp16=False, temperature=0.0)
+        with model_registry.use(model_size) as model:
+            n_mels = getattr(model.dims, 'n_mels', 80)
+            tokenizer_kwargs = {'num_languages': model.num_languages} if hasattr(model, 'num_languages') else {}
+            tokenizer = whisper.tokenizer.get_tokenizer(model.is_multilingual, language='ko', task='transcribe',
+                                                        **tokenizer_kwargs)
+            sample_len = model.dims.n_text_ctx // 2  # DecodingOptions 기본 토큰 한도
+            fallbacks = 0
+            for batch_start in range(0, len(windows), batch_size):
+                batch = windows[batch_start:batch_start + batch_size]
+                # log-mel은 창별로 계산 (정규화 기준이 다른 클립에 영향받지 않도록) 후 묶음
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(piece), n_mels=n_mels) for _, _, _, piece in batch
+                ]).to(model.device)
+                for (video_idx, start_sec, end_sec, piece), decoded in zip(batch, whisper.decode(model, mels, options)):
+                    raise_if_cancelled()
+                    if decoded.no_speech_prob > 0.6 and decoded.avg_logprob < -1.0:
+                        continue
+                    segments = _timestamped_segments(decoded.tokens, tokenizer, end_sec - start_sec)
+                    if _needs_fallback(decoded, sample_len):
+                        fallbacks += 1
+                        result = model.transcribe(piece, language='ko', fp16=False, task='transcribe',
+                                                  condition_on_previous_text=False)
+                        segments = [(seg['start'], seg['end'], seg['text'].strip()) for seg in result['segments']]
+                    # 창은 원본 오디오를 그대로 잘라낸 것이므로 창 시작 시각만 더하면 원본 시간
+                    for seg_start, seg_end, text in segments:
+                        if text:
+                            results[video_idx].append({'start': float(min(start_sec + seg_start, end_sec)),
+                                                       'end': float(min(start_sec + seg_end, end_sec)), 'text': text})
+            if fallbacks:
+                print(f"🔁 Re-transcribed {fallbacks} windows individually (quality check / token limit)")
     
-    url = "https://api.anthropic.com/v1/messages"
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
+    srt_paths = []
+    for video_idx, video_path in enumerate(video_paths):
+        segments = results[video_idx]
+        transcript = compose_srt(segments)
+        if video_idx in cache_keys:
+            transcript_cache.put(cache_keys[video_idx], segments, transcript, source=os.path.basename(video_path))
+        
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        srt_path = os.path.join(output_dir, f"{base_name}_korean.srt")
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write(transcript)
+        print(f"✅ SRT file saved: {srt_path} ({len(segments)} segments)")
+        srt_paths.append(srt_path)
     
-    prompt = f"""다음은 Whisper AI가 한국어 음성을 인식한 결과입니다. 문맥상 어색하거나 잘못 인식된 단어들을 자연스럽게 수정해주세요.
+    return srt_paths
 
-원본 텍스트:
-{text}
+def _correction_prompt(lines):
+    numbered = "\n".join(f"{i + 1}. {line}" for i, line in enumerate(lines))
+    return f"""다음은 Whisper AI가 한국어 음성을 인식한 자막입니다 (한 줄이 자막 하나). 문맥상 어색하거나 잘못 인식된 단어들을 자연스럽게 수정해주세요.
+
+원본 자막:
+{numbered}
 
 수정 가이드라인:
 1. 문맥에 맞지 않는 단어를 자연스러운 한국어로 수정
@@ -143,42 +396,78 @@ def improve_text_with_claude(text, api_key):
 3. 전체적인 문맥과 흐름을 자연스럽게 유지
 4. 원본의 의미와 뉘앙스를 최대한 보존
 5. 수정이 불필요한 부분은 그대로 유지
+6. 줄을 합치거나 나누지 말고 번호를 유지
 
-수정된 텍스트만 출력해주세요:"""
-    
-    payload = {
-        "model": "claude-3-haiku-20240307",
-        "max_tokens": 2000,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+정확히 {len(lines)}줄, 'N. 수정된 자막' 형식으로만 출력해주세요:"""
+
+def _correct_chunk(lines, api_key):
+    """자막 한 묶음 교정 (실패하거나 줄 수가 맞지 않으면 None)"""
+    raise_if_cancelled()
     
+    # 재시도/백오프, 호출 지표 기록은 번역 백엔드와 같은 경로 사용
+    backend = ClaudeBackend(api_key=api_key, model=CORRECTION_MODEL)
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = backend._request(_correction_prompt(lines), max_tokens=4000, operation="improve_text")
+    except TranslationError as e:
+        print(f"⚠️  Claude API 호출 실패: {e}, 이 묶음은 원본 자막 유지")
+        return None
+    
+    corrected = parse_numbered_lines(response, len(lines))
+    if corrected is None or not all(corrected):
+        print(f"⚠️  교정 결과 줄 수 불일치 ({len(lines)}줄), 이 묶음은 원본 자막 유지")
+        return None
+    return corrected
+
+def _correction_cache_path(lines):
+    digest = hashlib.sha256(f"{CORRECTION_MODEL}\n{_correction_prompt(lines)}".encode('utf-8')).hexdigest()
+    return os.path.join(CORRECTION_CACHE_DIR, f"{digest}.json")
+
+def improve_lines_with_claude(lines, api_key, chunk_size=CLAUDE_CORRECTION_CHUNK_LINES, max_workers=CLAUDE_CORRECTION_WORKERS):
+    """
+    자막 줄 목록을 Claude로 교정 (입력과 같은 줄 수 유지)
+    
+    chunk_size줄씩 나누어 동시에 요청하고, 묶음별 결과는 내용 해시로 캐시
+    실패하거나 줄 수가 맞지 않는 묶음은 원본을 그대로 사용
+    """
+    indices = [i for i, line in enumerate(lines) if line.strip()]
+    chunks = [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+    if not chunks:
+        return list(lines)
+    
+    print(f"🧠 Claude API로 텍스트 정확도 개선 중... ({len(indices)}줄, {len(chunks)}개 묶음)")
+    
+    corrected = list(lines)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk in chunks:
+            chunk_lines = [lines[i] for i in chunk]
+            cache_path = _correction_cache_path(chunk_lines)
+            if os.path.exists(cache_path):
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    for i, line in zip(chunk, json.load(f)):
+                        corrected[i] = line
+                continue
+            future = executor.submit(contextvars.copy_context().run, _correct_chunk, chunk_lines, api_key)
+            pending[future] = (chunk, cache_path)
         
-        if response.status_code == 200:
-            data = response.json()
-            if "content" in data and len(data["content"]) > 0:
-                improved_text = data["content"][0]["text"].strip()
-                print("✅ Claude API로 텍스트 개선 완료")
-                print(f"원본 길이: {len(text)} → 수정 길이: {len(improved_text)}")
-                return improved_text
-            else:
-                print("⚠️  Claude API 응답 구조 오류, 원본 텍스트 반환")
-                return text
-        else:
-            print(f"⚠️  Claude API 오류 (status: {response.status_code}), 원본 텍스트 반환")
-            if response.status_code == 429:
-                print("   → API 호출 한도 초과")
-            elif response.status_code == 401:
-                print("   → API 키 인증 오류")
-            return text
-            
-    except requests.exceptions.Timeout:
-        print("⚠️  Claude API 타임아웃, 원본 텍스트 반환")
-        return text
-    except Exception as e:
-        print(f"⚠️  Claude API 호출 실패: {e}, 원본 텍스트 반환")
-        return text
+        failed = 0
+        for future, (chunk, cache_path) in pending.items():
+            result = future.result()
+            if result is None:
+                failed += 1
+                continue
+            for i, line in zip(chunk, result):
+                corrected[i] = line
+            os.makedirs(CORRECTION_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+    
+    print(f"✅ Claude API로 텍스트 개선 완료 (요청 {len(pending)}개, 캐시 {len(chunks) - len(pending)}개, 실패 {failed}개)")
+    return corrected
+
+def improve_text_with_claude(text, api_key):
+    """Claude API를 사용하여 Whisper 텍스트의 오타와 인식 오류를 수정 (줄 구성 유지)"""
+    return '\n'.join(improve_lines_with_claude(text.split('\n'), api_key))
 
 def get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=None):
     """SRT 파일에서 텍스트만 추출하고 선택적으로 Claude로 개선"""
@@ -186,15 +475,13 @@ def get_text_from_srt(srt_path, improve_with_claude=True, claude_api_key=None):
         with open(srt_path, 'r', encoding='utf-8') as f:
             subtitles = list(srt.parse(f.read()))
         
-        text_lines = [sub.content for sub in subtitles]
-        original_text = '\n'.join(text_lines)
+        # 자막 하나당 한 줄 (SRT 타이밍에 다시 맞출 수 있도록 여러 줄 자막은 한 줄로)
+        text_lines = [' '.join(sub.content.split('\n')) for sub in subtitles]
         
         # Claude API로 텍스트 개선 (옵션)
         if improve_with_claude and claude_api_key:
-            improved_text = improve_text_with_claude(original_text, claude_api_key)
-            return improved_text
-        else:
-            return original_text
+            text_lines = improve_lines_with_claude(text_lines, claude_api_key)
+        return '\n'.join(text_lines)
         
     except Exception as e:
         print(f"❌ Error reading SRT file: {e}")
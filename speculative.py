@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+업로드 직후 미리 실행하는 추측성(speculative) 작업 관리
+음성 추출/타이틀 번역을 백그라운드에서 먼저 돌려두고, 이후 요청에서 결과를 바로 재사용
+설정이 바뀌어 결과가 쓸모없어지면 작업을 취소
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeoutError
+
+from config import SPECULATIVE_WORKERS, SPECULATIVE_TTL
+
+
+class SpeculationCancelled(Exception):
+    """설정 변경으로 더 이상 필요 없어진 추측성 작업"""
+
+
+class SpeculativeCache:
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or SPECULATIVE_WORKERS,
+                                            thread_name_prefix="speculative")
+        self._tasks = {}  # key → (signature, future, cancel_event, created_at)
+        self._lock = threading.Lock()
+
+    def submit(self, key, signature, fn, *args, **kwargs):
+        """
+        작업 예약 - 같은 key에 같은 signature 작업이 있으면 그대로 두고, 다르면 기존 작업을 취소 후 교체
+
+        fn은 cancel_event 키워드 인자를 받아 단계 사이마다 확인해야 함
+        """
+        with self._lock:
+            self._prune_expired()
+            existing = self._tasks.get(key)
+            if existing and existing[0] == signature:
+                return existing[1]
+            if existing:
+                self._cancel_entry(key, existing)
+
+            cancel_event = threading.Event()
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args,
+                                           cancel_event=cancel_event, **kwargs)
+            self._tasks[key] = (signature, future, cancel_event, time.monotonic())
+            return future
+
+    def get(self, key, signature, timeout=None):
+        """
+        signature가 일치하는 결과 반환 (없거나 실패/취소되면 None, 실행 중이면 timeout까지 대기)
+
+        끝난 작업은 결과를 꺼낸 뒤 목록에서 제거 (한 번만 사용)
+        """
+        with self._lock:
+            entry = self._tasks.get(key)
+        if not entry or entry[0] != signature:
+            return None
+
+        try:
+            return entry[1].result(timeout=timeout)
+        except (CancelledError, SpeculationCancelled, FutureTimeoutError):
+            return None
+        except Exception as e:
+            print(f"⚠️ 추측성 작업 결과 사용 불가 ({key}): {e}")
+            return None
+        finally:
+            if entry[1].done():
+                with self._lock:
+                    if self._tasks.get(key) is entry:
+                        del self._tasks[key]
+
+    def cancel(self, predicate):
+        """predicate(key, signature)가 True인 작업 취소"""
+        with self._lock:
+            for key, entry in list(self._tasks.items()):
+                if predicate(key, entry[0]):
+                    self._cancel_entry(key, entry)
+
+    def _prune_expired(self):
+        """SPECULATIVE_TTL이 지나도록 사용되지 않은 작업 취소/폐기 (lock 보유 상태에서 호출)"""
+        deadline = time.monotonic() - SPECULATIVE_TTL
+        for key, entry in list(self._tasks.items()):
+            if entry[3] < deadline:
+                self._cancel_entry(key, entry)
+
+    def _cancel_entry(self, key, entry):
+        _, future, cancel_event, _ = entry
+        cancel_event.set()
+        future.cancel()
+        del self._tasks[key]
+        print(f"🛑 추측성 작업 취소: {key}")
+
+
+def check_cancelled(cancel_event):
+    """작업 단계 사이에서 호출 - 취소되었으면 예외 발생"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise SpeculationCancelled()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+문장 × 언어 작업 스케줄러
+모든 (자막 문장, 언어) 쌍을 하나의 우선순위 큐에 넣고 공용 워커 풀로 처리
+앞쪽 문장이 먼저 끝나도록 문장 번호를 우선순위로 사용
+"""
+
+import contextvars
+import queue
+import threading
+
+from tqdm import tqdm
+
+from config import TRANSLATION_WORKERS
+
+
+class CueTaskScheduler:
+    def __init__(self, task_fn, max_workers=None, on_result=None, desc="번역 중"):
+        """
+        Args:
+            task_fn (callable): task_fn(item, lang) → 결과
+            max_workers (int): 워커 스레드 수 (기본값: TRANSLATION_WORKERS)
+            on_result (callable): on_result(index, lang, result) - 작업 하나가 끝날 때마다 호출
+            desc (str): 진행률 표시 문구
+        """
+        self.task_fn = task_fn
+        self.max_workers = max_workers or TRANSLATION_WORKERS
+        self.on_result = on_result
+        self.desc = desc
+
+    def run(self, items, languages):
+        """모든 (item, lang) 작업을 처리하고 {lang: [결과...]}를 item 순서대로 반환"""
+        results = {lang: [None] * len(items) for lang in languages}
+        total = len(items) * len(languages)
+        if total == 0:
+            return results
+
+        tasks = queue.PriorityQueue()
+        for index in range(len(items)):
+            for lang_order, lang in enumerate(languages):
+                tasks.put((index, lang_order, lang))
+
+        errors = []
+        lock = threading.Lock()
+        pbar = tqdm(total=total, desc=self.desc, unit="작업")
+
+        def worker():
+            while not errors:
+                try:
+                    index, _, lang = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    result = self.task_fn(items[index], lang)
+                except BaseException as e:
+                    # 작업 취소(OperationCancelled)도 기록해 다른 워커를 멈추고 run()에서 다시 발생
+                    with lock:
+                        errors.append(e)
+                    return
+                results[lang][index] = result
+                if self.on_result:
+                    self.on_result(index, lang, result)
+                with lock:
+                    pbar.update(1)
+
+        # 호출 스레드의 컨텍스트(작업 ID 등)를 워커 스레드에도 전달
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(worker,), daemon=True)
+                   for _ in range(min(self.max_workers, total))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pbar.close()
+
+        if errors:
+            raise errors[0]
+        return results
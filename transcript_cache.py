@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+음성 인식 결과 캐시
+(오디오 내용 해시, 백엔드, 모델, 언어, VAD 설정)을 키로 구간 목록과 SRT를 저장해
+같은 영상을 다시 처리할 때 음성 인식을 건너뜀
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import srt
+
+from config import CACHE_DIR, VAD_ENABLED
+from audio_vad import vad_settings
+
+TRANSCRIPT_CACHE_DIR = os.path.join(CACHE_DIR, "transcripts")
+
+
+def transcript_key(audio_hash, backend, model, language, **options):
+    """
+    캐시 키 생성 - VAD를 켠 경우 VAD 파라미터도 키에 포함
+
+    options: 결과에 영향을 주는 추가 설정 (예: 업로드 코덱)
+    """
+    key_data = {
+        'audio': audio_hash,
+        'backend': backend,
+        'model': model,
+        'language': language,
+        'vad': vad_settings() if VAD_ENABLED else None,
+        **options,
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def segments_from_srt(transcript):
+    """SRT 문자열 → 구간 목록 [{start, end, text}]"""
+    return [
+        {'start': sub.start.total_seconds(), 'end': sub.end.total_seconds(), 'text': sub.content}
+        for sub in srt.parse(transcript)
+    ]
+
+
+class TranscriptCache:
+    def __init__(self, cache_dir=TRANSCRIPT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """캐시된 결과 {'segments': [...], 'srt': str} (없으면 None)"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 음성 인식 캐시 읽기 실패 ({key[:12]}): {e}")
+            return None
+
+    def put(self, key, segments, transcript, **meta):
+        """결과 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        record = {'segments': segments, 'srt': transcript, 'meta': meta}
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+
+transcript_cache = TranscriptCache()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+음성 인식 경로 선택 (로컬 Whisper 워커 / Whisper API / 둘로 나누어 동시 처리)
+오디오 길이, 로컬 워커 대기 작업 수, 가용 메모리, 최근 API 실패율로 작업마다 경로를 고르고 결정 내역을 기록
+"""
+
+import contextvars
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import srt
+
+from config import (
+    OPENAI_API_KEY, WHISPER_MIN_FREE_MEMORY_MB, TRANSCRIPTION_ROUTER,
+    ROUTER_LOCAL_RTF, ROUTER_API_RTF, ROUTER_API_MAX_FAILURE_RATE, ROUTER_SPLIT_MIN_SECONDS
+)
+from api_metrics import metrics
+from audio_cache import extract_audio, load_pcm, write_wav, SAMPLE_RATE
+from audio_vad import find_quiet_point
+from transcription_worker import transcription_pool
+
+API_OVERHEAD_SECONDS = 5.0  # 업로드/대기 등 API 요청당 고정 비용 추정치
+
+
+def _free_memory_mb():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available // (1024 * 1024)
+
+
+class TranscriptionRouter:
+    def __init__(self, mode=TRANSCRIPTION_ROUTER, history=100):
+        self.mode = mode
+        self._decisions = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    # === 경로 결정 ===
+    def decide(self, duration):
+        """
+        오디오 길이(초)에 대한 경로 결정
+
+        Returns:
+            dict: backend('local' | 'api' | 'split'), reason, local_share(분할 시 앞부분 로컬 비율)과 판단 근거 수치
+        """
+        queue_depth = transcription_pool.queue_depth()
+        free_memory_mb = _free_memory_mb()
+        failure_rate = metrics.recent_failure_rate("openai", "transcribe")
+
+        api_key_ok = bool(OPENAI_API_KEY) and OPENAI_API_KEY != "YOUR_OPENAI_API_KEY_HERE"
+        api_ok = api_key_ok and (failure_rate is None or failure_rate < ROUTER_API_MAX_FAILURE_RATE)
+        whisper_installed = importlib.util.find_spec('whisper') is not None
+        memory_ok = free_memory_mb is None or free_memory_mb >= WHISPER_MIN_FREE_MEMORY_MB
+        local_ok = whisper_installed and memory_ok
+
+        # 로컬은 앞선 작업이 끝나야 시작하므로 대기 작업 수만큼 느려진다고 추정
+        local_seconds = duration * ROUTER_LOCAL_RTF * (queue_depth + 1)
+        api_seconds = duration * ROUTER_API_RTF + API_OVERHEAD_SECONDS
+
+        decision = {
+            'duration': round(duration, 1),
+            'queue_depth': queue_depth,
+            'free_memory_mb': free_memory_mb,
+            'api_failure_rate': failure_rate,
+            'estimated_local_seconds': round(local_seconds, 1),
+            'estimated_api_seconds': round(api_seconds, 1),
+            'local_share': None,
+        }
+
+        if self.mode in ('local', 'api'):
+            decision.update(backend=self.mode, reason=f"TRANSCRIPTION_ROUTER={self.mode}")
+        elif not api_ok and not local_ok:
+            decision.update(backend='local', reason="API/로컬 모두 조건 미달 - 로컬로 시도")
+        elif not api_ok:
+            reason = "API 키 없음" if not api_key_ok else f"API 최근 실패율 {failure_rate:.0%}"
+            decision.update(backend='local', reason=reason)
+        elif not local_ok:
+            reason = "Whisper 미설치" if not whisper_installed else f"가용 메모리 {free_memory_mb}MB"
+            decision.update(backend='api', reason=reason)
+        elif duration >= ROUTER_SPLIT_MIN_SECONDS:
+            # 두 경로가 비슷한 시각에 끝나도록 앞부분 비율 결정
+            local_rate = ROUTER_LOCAL_RTF * (queue_depth + 1)
+            local_share = ROUTER_API_RTF / (local_rate + ROUTER_API_RTF)
+            decision.update(backend='split', reason=f"긴 오디오 - 로컬 {local_share:.0%} / API {1 - local_share:.0%}",
+                            local_share=round(local_share, 3))
+        elif local_seconds <= api_seconds:
+            decision.update(backend='local', reason="로컬 예상 시간이 더 짧음")
+        else:
+            decision.update(backend='api', reason="API 예상 시간이 더 짧음")
+
+        return decision
+
+    def _record(self, video_path, decision):
+        decision = dict(decision, file=os.path.basename(video_path), timestamp=time.time())
+        with self._lock:
+            self._decisions.append(decision)
+        print(f"🧭 음성 인식 경로: {decision['backend']} ({decision['reason']}) - "
+              f"{decision['duration']}초, 대기 {decision['queue_depth']}, 메모리 {decision['free_memory_mb']}MB, "
+              f"API 실패율 {decision['api_failure_rate']}")
+
+    def recent_decisions(self):
+        with self._lock:
+            return list(self._decisions)
+
+    # === 실행 ===
+    def transcribe(self, video_path, output_dir, model_size="base"):
+        """선택한 경로로 음성 인식 후 SRT 경로 반환 (로컬 워커와 같은 파일명 규칙)"""
+        try:
+            wav_path = extract_audio(video_path)
+        except Exception as e:
+            # 길이를 알 수 없으면 로컬 워커에 맡김 (ffmpeg가 없을 때의 처리 포함)
+            print(f"⚠️ 오디오 길이 확인 실패, 로컬로 처리합니다: {e}")
+            return transcription_pool.transcribe(video_path, output_dir, model_size=model_size)
+
+        decision = self.decide(os.path.getsize(wav_path) / (SAMPLE_RATE * 2))
+        self._record(video_path, decision)
+
+        if decision['backend'] == 'local':
+            return transcription_pool.transcribe(video_path, output_dir, model_size=model_size)
+
+        try:
+            if decision['backend'] == 'api':
+                from main import transcribe_source_api
+                transcript = transcribe_source_api(video_path)
+            else:
+                transcript = self._transcribe_split(wav_path, decision['local_share'], model_size)
+        except Exception as e:
+            print(f"⚠️ {decision['backend']} 경로 실패, 로컬로 다시 처리합니다: {e}")
+            return transcription_pool.transcribe(video_path, output_dir, model_size=model_size)
+
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        srt_path = os.path.join(output_dir, f"{base_name}_korean.srt")
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write(transcript)
+        return srt_path
+
+    def _transcribe_split(self, wav_path, local_share, model_size):
+        """앞부분은 로컬 워커, 뒷부분은 API로 동시에 인식해 하나의 SRT로 병합"""
+        from main import transcribe_source_api
+
+        pcm = load_pcm(wav_path)
+        split_at = find_quiet_point(pcm, len(pcm) / SAMPLE_RATE * local_share)
+        offset = timedelta(seconds=split_at / SAMPLE_RATE)
+
+        part_dir = tempfile.mkdtemp(prefix="split_transcribe_")
+        try:
+            local_part = os.path.join(part_dir, "part_local.wav")
+            api_part = os.path.join(part_dir, "part_api.wav")
+            write_wav(local_part, pcm[:split_at])
+            write_wav(api_part, pcm[split_at:])
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                local_future = executor.submit(contextvars.copy_context().run, transcription_pool.transcribe,
+                                               local_part, part_dir, model_size)
+                api_future = executor.submit(contextvars.copy_context().run, transcribe_source_api, api_part)
+                with open(local_future.result(), 'r', encoding='utf-8') as f:
+                    local_subs = list(srt.parse(f.read()))
+                api_subs = list(srt.parse(api_future.result()))
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+        for sub in api_subs:
+            sub.start += offset
+            sub.end += offset
+        return srt.compose(local_subs + api_subs)
+
+
+transcription_router = TranscriptionRouter()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+로컬 Whisper 음성 인식 워커 프로세스 풀
+CPU를 많이 쓰는 추론을 웹 프로세스 밖에서 실행해 HTTP 요청(진행 상황 조회 등)이 밀리지 않도록 함
+워커는 시작할 때 WHISPER_WARMUP_MODELS 모델을 미리 로드하고, 작업은 풀의 큐를 통해 전달됨
+취소는 해당 작업을 실행 중인 워커에서만 처리 (다른 세션의 작업과 미리 로드한 모델은 유지)
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from config import TRANSCRIPTION_WORKERS, WHISPER_WARMUP_MODELS, TRANSCRIPTION_CANCEL_GRACE
+from cancellation import cancellation_registry, current_token, raise_if_cancelled, OperationCancelled
+
+# 워커 프로세스에서 실행 중인 작업 ID와 취소 요청된 작업 ID (같은 프로세스 안에서만 사용)
+_task_state = {'current': None, 'cancel': None}
+
+
+def _on_cancel_signal(signum, frame):
+    """취소 요청된 작업이 아직 실행 중이면 메인 스레드에서 중단 (이미 끝났으면 무시)"""
+    if _task_state['current'] is not None and _task_state['cancel'] == _task_state['current']:
+        raise OperationCancelled(_task_state['current'])
+
+
+def _init_worker(warmup_models):
+    """워커 프로세스 초기화 - 취소 신호 처리기 등록, 모델 미리 로드"""
+    signal.signal(signal.SIGUSR1, _on_cancel_signal)
+    from whisper_registry import model_registry
+    if warmup_models:
+        model_registry.warmup(warmup_models)
+
+
+def _run_cancellable(task_id, cancel_event, fn, *args):
+    """
+    워커에서 fn 실행 - cancel_event가 설정되면 이 작업만 중단
+
+    먼저 취소 토큰으로 외부 프로세스(ffmpeg)를 종료하고 단계 사이 확인(raise_if_cancelled)에서 멈추기를 기다린 뒤,
+    그래도 실행 중이면(Whisper 추론 등) 신호로 메인 스레드를 중단
+    """
+    done = threading.Event()
+    with cancellation_registry.scope(task_id) as token:
+        def watch():
+            while not done.is_set():
+                try:
+                    if cancel_event.wait(0.5):
+                        break
+                except (EOFError, OSError):
+                    return  # 메인 프로세스의 Manager가 종료됨
+            else:
+                return
+            token.cancel()
+            if not done.wait(1.0):
+                _task_state['cancel'] = task_id
+                os.kill(os.getpid(), signal.SIGUSR1)
+
+        _task_state['current'] = task_id
+        threading.Thread(target=watch, daemon=True).start()
+        try:
+            return fn(*args)
+        finally:
+            _task_state['current'] = None
+            done.set()
+
+
+def _noop():
+    return None
+
+
+def _transcribe_in_worker(video_path, output_dir, model_size):
+    from simple_whisper import extract_audio_with_whisper
+    return extract_audio_with_whisper(video_path, output_dir, model_size=model_size)
+
+
+def _transcribe_batch_in_worker(video_paths, output_dir, model_size):
+    from simple_whisper import extract_audio_with_whisper_batch
+    return extract_audio_with_whisper_batch(video_paths, output_dir, model_size=model_size)
+
+
+class TranscriptionWorkerPool:
+    def __init__(self, max_workers=TRANSCRIPTION_WORKERS, warmup_models=None):
+        self.max_workers = max_workers
+        self.warmup_models = WHISPER_WARMUP_MODELS if warmup_models is None else warmup_models
+        self._executor = None
+        self._manager = None  # 작업별 취소 이벤트를 워커와 공유하기 위한 Manager
+        self._pending = 0  # 대기 + 실행 중인 작업 수
+        self._lock = threading.Lock()
+
+    def start(self):
+        """워커 프로세스 시작 (메인 프로세스에서만, 이미 시작했으면 무시)"""
+        if self.max_workers <= 0 or multiprocessing.parent_process() is not None:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # torch/스레드와 안전하게 함께 쓰도록 fork 대신 spawn 사용
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.warmup_models,)
+                )
+                if self._manager is None:
+                    self._manager = multiprocessing.get_context('spawn').Manager()
+                # 프로세스는 작업이 들어올 때 생성되므로 빈 작업으로 미리 띄워 모델 로드를 시작
+                for _ in range(self.max_workers):
+                    self._executor.submit(_noop)
+                print(f"🧵 음성 인식 워커 {self.max_workers}개 시작 (미리 로드: {self.warmup_models or '없음'})")
+            return self._executor
+
+    def queue_depth(self):
+        """아직 끝나지 않은 음성 인식 작업 수"""
+        with self._lock:
+            return self._pending
+
+    def _run(self, fn, *args, weight=1):
+        """
+        워커에서 실행하고 결과 반환 (완료까지 대기)
+
+        워커를 쓰지 않으면 현재 프로세스에서 실행, 워커 프로세스가 비정상 종료되면 풀을 다시 만들어 한 번 재시도
+        """
+        with self._lock:
+            self._pending += weight
+        try:
+            executor = self.start()
+            if executor is None:
+                return fn(*args)
+            cancel_event = None
+            if current_token() is not None:
+                # 취소 가능한 작업은 워커에서 이 작업만 중단할 수 있도록 감싸서 실행
+                cancel_event = self._manager.Event()
+                fn, args = _run_cancellable, (uuid.uuid4().hex, cancel_event, fn) + args
+            try:
+                return self._wait(executor.submit(fn, *args), cancel_event)
+            except BrokenProcessPool:
+                raise_if_cancelled()
+                print("⚠️ 음성 인식 워커가 비정상 종료되어 다시 시작합니다.")
+                with self._lock:
+                    # 다른 작업이 이미 새 풀을 만들었으면 그대로 사용
+                    if self._executor is executor:
+                        self._executor = None
+                return self._wait(self.start().submit(fn, *args), cancel_event)
+        finally:
+            with self._lock:
+                self._pending -= weight
+
+    def _wait(self, future, cancel_event=None):
+        """
+        결과 대기 - 현재 작업이 취소되면 대기 중인 작업은 빼고, 이미 실행 중이면 그 워커에서만 중단
+
+        TRANSCRIPTION_CANCEL_GRACE초 안에 멈추지 않으면(신호를 받지 못하는 네이티브 코드 등) 마지막 수단으로 풀 전체 종료
+        """
+        token = current_token()
+        if token is None or cancel_event is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except FutureTimeoutError:
+                if token.cancelled:
+                    if not future.cancel():
+                        cancel_event.set()
+                        try:
+                            future.result(timeout=TRANSCRIPTION_CANCEL_GRACE)
+                        except FutureTimeoutError:
+                            self._kill_workers()
+                        except (OperationCancelled, Exception):
+                            pass
+                    token.check()
+
+    def _kill_workers(self):
+        """
+        실행 중인 워커 프로세스 강제 종료 (다음 작업에서 풀을 다시 만듦)
+
+        취소 요청에 응답하지 않는 워커에만 쓰는 마지막 수단 - 같은 풀의 다른 작업도 BrokenProcessPool로 다시 실행됨
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        print("🛑 취소된 음성 인식 작업의 워커 프로세스를 종료했습니다.")
+
+    def transcribe(self, video_path, output_dir, model_size="tiny"):
+        """음성 인식 후 SRT 경로 반환"""
+        return self._run(_transcribe_in_worker, video_path, output_dir, model_size)
+
+    def transcribe_batch(self, video_paths, output_dir, model_size="base"):
+        """여러 영상을 한 워커에서 배치 추론 후 영상별 SRT 경로 목록 반환"""
+        return self._run(_transcribe_batch_in_worker, video_paths, output_dir, model_size, weight=len(video_paths))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+
+transcription_pool = TranscriptionWorkerPool()
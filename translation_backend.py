@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+번역 백엔드 인터페이스
+Claude HTTP API 구현과 네트워크 없이 동작하는 로컬 스텁 구현을 제공
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+import zlib
+
+import requests
+
+from api_metrics import metrics, classify_failure
+from cancellation import raise_if_cancelled, cancellable_sleep
+from config import (
+    CLAUDE_API_KEY, CLAUDE_MODEL, TRANSLATION_BACKEND, API_MAX_RETRIES, API_RETRY_BACKOFF,
+    STUB_TRANSLATION_MODE, STUB_TRANSLATION_LATENCY, STUB_TRANSLATION_ERROR_RATE, STUB_TRANSLATION_SEED
+)
+
+
+class TranslationError(Exception):
+    """번역 백엔드 호출 실패"""
+
+
+# === 프롬프트 ===
+def build_prompt(text, target_lang, source_lang="Korean", kind="subtitle", hint=None):
+    """번역 종류(title/subtitle)에 맞는 프롬프트 생성 (hint: 유사 문장의 (원문, 번역))"""
+    if hint:
+        hint_source, hint_translation = hint
+        text = f"{text}\n\n(For consistency: a similar line \"{hint_source}\" was previously translated as \"{hint_translation}\". Translate only the line above.)"
+    if kind == "title":
+        return f"Translate this {source_lang} video title to {target_lang}. Make it SHORT, CATCHY and suitable for a video title. Keep it under 6 words if possible. Do NOT transliterate - translate the meaning. Provide only the translated title:\n{text}"
+    return f"Translate this {source_lang} video subtitle to natural, conversational {target_lang}. Make it sound like how people actually speak in videos - casual and natural. Do NOT transliterate pronunciation - translate the meaning. Provide only the translated subtitle:\n{text}"
+
+
+def build_batch_prompt(texts, target_lang, source_lang="Korean", kind="subtitle"):
+    """여러 줄을 번호를 붙여 한 번에 번역하는 프롬프트 생성"""
+    what = "video titles" if kind == "title" else "video subtitles"
+    numbered = "\n".join(f"{i + 1}. {text.replace(chr(10), ' ')}" for i, text in enumerate(texts))
+    return (f"Translate each of these {len(texts)} {source_lang} {what} to natural, conversational {target_lang}. "
+            f"Do NOT transliterate - translate the meaning. Keep the numbering and output exactly {len(texts)} lines "
+            f"in the form 'N. translation', nothing else:\n{numbered}")
+
+
+def clean_translation(translated_text):
+    """Claude의 설명 텍스트와 따옴표를 제거하고 번역문만 반환"""
+    translated_text = translated_text.strip()
+    lines = translated_text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if line and not line.lower().startswith(('the translation', 'here is', 'the korean text', 'translated to', 'translation:')):
+            # 따옴표로 감싸진 텍스트면 따옴표 제거
+            if line.startswith('"') and line.endswith('"'):
+                return line[1:-1]
+            else:
+                return line
+
+    # 만약 위 조건에 맞는 라인이 없으면 전체 텍스트 반환
+    return translated_text
+
+
+def parse_numbered_lines(text, count):
+    """'N. 번역' 형식의 응답을 순서대로 파싱 (개수가 맞지 않으면 None)"""
+    results = {}
+    for line in text.strip().split('\n'):
+        match = re.match(r'^\s*(\d+)[.)]\s*(.*)$', line)
+        if match:
+            results[int(match.group(1))] = match.group(2).strip()
+    if sorted(results) != list(range(1, count + 1)):
+        return None
+    return [results[i] for i in range(1, count + 1)]
+
+
+# === 백엔드 인터페이스 ===
+class TranslationBackend:
+    name = "base"
+    # 일괄 작업 ID가 프로세스 재시작 후에도 유효한지 (로컬 대체 구현은 메모리에만 존재)
+    bulk_resumable = False
+
+    def translate(self, text, target_lang, source_lang="Korean", kind="subtitle", hint=None):
+        """텍스트 하나를 번역 (실패시 TranslationError, hint는 참고용 (원문, 번역) 쌍)"""
+        raise NotImplementedError
+
+    def translate_batch(self, texts, target_lang, source_lang="Korean", kind="subtitle"):
+        """여러 텍스트를 같은 언어로 번역 (입력 순서 유지)"""
+        return [self.translate(text, target_lang, source_lang, kind) for text in texts]
+
+    def translate_multi(self, text, target_langs, source_lang="Korean", kind="subtitle"):
+        """텍스트 하나를 여러 언어로 번역"""
+        return {lang: self.translate(text, lang, source_lang, kind) for lang in target_langs}
+
+    # === 일괄(지연) 번역 ===
+    # 기본 구현은 백그라운드 스레드에서 translate()를 돌리는 로컬 대체 구현
+    def submit_bulk(self, units):
+        """
+        번역 단위 목록을 일괄 작업으로 제출
+
+        Args:
+            units (list): {'id', 'text', 'target_lang', 'source_lang', 'kind'} 딕셔너리 목록
+
+        Returns:
+            str: 일괄 작업 ID
+        """
+        job_id = f"local_{uuid.uuid4().hex}"
+        job = {'status': 'in_progress', 'results': {}}
+        with _bulk_lock:
+            _local_bulk_jobs[job_id] = job
+
+        def run():
+            for unit in units:
+                try:
+                    job['results'][unit['id']] = self.translate(
+                        unit['text'], unit['target_lang'], unit.get('source_lang', 'Korean'), unit.get('kind', 'subtitle'))
+                except TranslationError as e:
+                    print(f"⚠️  일괄 번역 단위 실패 ({unit['id']}): {e}")
+                    job['results'][unit['id']] = None
+            job['status'] = 'ended'
+
+        threading.Thread(target=run, daemon=True).start()
+        return job_id
+
+    def poll_bulk(self, job_id):
+        """일괄 작업 상태 ('in_progress' / 'ended')"""
+        return _local_bulk_jobs[job_id]['status']
+
+    def fetch_bulk(self, job_id):
+        """완료된 일괄 작업 결과 {단위 ID: 번역 (실패시 None)}"""
+        with _bulk_lock:
+            job = _local_bulk_jobs.pop(job_id)
+        return job['results']
+
+
+_local_bulk_jobs = {}
+_bulk_lock = threading.Lock()
+
+
+class ClaudeBackend(TranslationBackend):
+    name = "claude"
+    bulk_resumable = True
+    API_URL = "https://api.anthropic.com/v1/messages"
+    RETRYABLE = ('rate_limited', 'server_error', 'timeout', 'connection')
+
+    def __init__(self, api_key=None, model=None, timeout=60, max_retries=None):
+        self.api_key = api_key or CLAUDE_API_KEY
+        self.model = model or CLAUDE_MODEL
+        self.timeout = timeout
+        self.max_retries = API_MAX_RETRIES if max_retries is None else max_retries
+
+    def _request(self, prompt, max_tokens=1000, operation="translate"):
+        """Messages API 호출 후 응답 텍스트 반환 (일시적 오류는 재시도, 호출 지표 기록)"""
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        payload = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+
+        attempt = 0
+        started = time.time()
+        while True:
+            raise_if_cancelled()
+            status, data, error = None, None, None
+            try:
+                res = requests.post(self.API_URL, json=payload, headers=headers, timeout=self.timeout)
+                status = res.status_code
+                data = res.json()
+            except Exception as e:
+                error = e
+
+            failure = classify_failure(status, error)
+            if failure in self.RETRYABLE and attempt < self.max_retries:
+                attempt += 1
+                cancellable_sleep(API_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                continue
+            break
+
+        usage = (data or {}).get("usage") or {}
+        metrics.record("anthropic", operation, time.time() - started, status=status,
+                       input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0),
+                       retries=attempt, error=error)
+
+        if error is not None:
+            raise TranslationError(f"번역 요청 오류: {error}")
+
+        # API 응답 구조 확인
+        if "content" in data and len(data["content"]) > 0:
+            return data["content"][0]["text"]
+        elif "error" in data:
+            raise TranslationError(f"Claude API 오류: {data['error']}")
+        else:
+            raise TranslationError(f"예상치 못한 응답 구조: {data}")
+
+    def translate(self, text, target_lang, source_lang="Korean", kind="subtitle", hint=None):
+        prompt = build_prompt(text, target_lang, source_lang, kind, hint)
+        return clean_translation(self._request(prompt, operation=f"translate_{kind}"))
+
+    # === Message Batches API (비동기 일괄 처리) ===
+    def _batches_call(self, method, url, operation, **kwargs):
+        """Batches API 호출 (일시적 오류는 _request와 같은 방식으로 재시도)"""
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        attempt = 0
+        started = time.time()
+        while True:
+            raise_if_cancelled()
+            res, error = None, None
+            try:
+                res = requests.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except Exception as e:
+                error = e
+
+            failure = classify_failure(res.status_code if res is not None else None, error)
+            if failure in self.RETRYABLE and attempt < self.max_retries:
+                attempt += 1
+                cancellable_sleep(API_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                continue
+            break
+
+        if error is not None:
+            metrics.record("anthropic", operation, time.time() - started, retries=attempt, error=error)
+            raise TranslationError(f"일괄 번역 요청 오류: {error}")
+        metrics.record("anthropic", operation, time.time() - started, status=res.status_code, retries=attempt)
+        if res.status_code != 200:
+            raise TranslationError(f"Claude Batches API 오류 (status: {res.status_code}): {res.text[:200]}")
+        return res
+
+    def submit_bulk(self, units):
+        requests_payload = [{
+            "custom_id": unit['id'],
+            "params": {
+                "model": self.model,
+                "max_tokens": 1000,
+                "messages": [{"role": "user", "content": build_prompt(
+                    unit['text'], unit['target_lang'], unit.get('source_lang', 'Korean'), unit.get('kind', 'subtitle'))}]
+            }
+        } for unit in units]
+        res = self._batches_call("POST", f"{self.API_URL}/batches", "bulk_submit", json={"requests": requests_payload})
+        return res.json()["id"]
+
+    def poll_bulk(self, job_id):
+        res = self._batches_call("GET", f"{self.API_URL}/batches/{job_id}", "bulk_poll")
+        return "ended" if res.json().get("processing_status") == "ended" else "in_progress"
+
+    def fetch_bulk(self, job_id):
+        batch = self._batches_call("GET", f"{self.API_URL}/batches/{job_id}", "bulk_poll").json()
+        res = self._batches_call("GET", batch["results_url"], "bulk_results")
+
+        results = {}
+        for line in res.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            result = record.get("result", {})
+            if result.get("type") == "succeeded":
+                results[record["custom_id"]] = clean_translation(result["message"]["content"][0]["text"])
+            else:
+                results[record["custom_id"]] = None
+        return results
+
+    def translate_batch(self, texts, target_lang, source_lang="Korean", kind="subtitle"):
+        if len(texts) <= 1:
+            return super().translate_batch(texts, target_lang, source_lang, kind)
+
+        prompt = build_batch_prompt(texts, target_lang, source_lang, kind)
+        lines = parse_numbered_lines(self._request(prompt, max_tokens=4000, operation=f"translate_{kind}_batch"), len(texts))
+        if lines is None:
+            # 줄 수가 맞지 않으면 한 줄씩 다시 번역
+            print(f"⚠️  일괄 번역 응답 줄 수 불일치 ({target_lang}), 개별 번역으로 전환")
+            return super().translate_batch(texts, target_lang, source_lang, kind)
+        return lines
+
+
+class StubBackend(TranslationBackend):
+    """네트워크 없이 결정적인 결과를 돌려주는 로컬 스텁 (echo / pseudo)"""
+    name = "stub"
+
+    ACCENTS = str.maketrans("aeiouyAEIOUYcnsCNS", "àéîõüýÀÉÎÕÜÝçñšÇÑŠ")
+
+    def __init__(self, mode=None, latency=None, error_rate=None, seed=None):
+        self.mode = mode or STUB_TRANSLATION_MODE
+        self.latency = STUB_TRANSLATION_LATENCY if latency is None else latency
+        self.error_rate = STUB_TRANSLATION_ERROR_RATE if error_rate is None else error_rate
+        self.seed = STUB_TRANSLATION_SEED if seed is None else seed
+
+    def _should_fail(self, text, target_lang):
+        """입력별로 항상 같은 결과가 나오도록 해시 기반으로 오류 주입 여부 결정"""
+        if self.error_rate <= 0:
+            return False
+        key = f"{self.seed}:{target_lang}:{text}".encode("utf-8")
+        return zlib.crc32(key) / 0xFFFFFFFF < self.error_rate
+
+    def _pseudo_localize(self, text, target_lang):
+        """악센트 치환 + 약 30% 길이 확장 + 언어 태그로 의사 번역"""
+        accented = text.translate(self.ACCENTS)
+        padding = "~" * max(1, len(text) * 3 // 10)
+        return f"[{target_lang[:2].upper()}] {accented} {padding}"
+
+    def translate(self, text, target_lang, source_lang="Korean", kind="subtitle", hint=None):
+        raise_if_cancelled()
+        if self.latency > 0:
+            cancellable_sleep(self.latency)
+        if self._should_fail(text, target_lang):
+            raise TranslationError(f"스텁 오류 주입: {target_lang}")
+        if self.mode == "echo":
+            return text
+        return self._pseudo_localize(text, target_lang)
+
+
+BACKENDS = {
+    ClaudeBackend.name: ClaudeBackend,
+    StubBackend.name: StubBackend,
+}
+
+_backend_instances = {}
+_backend_lock = threading.Lock()
+
+
+def get_translation_backend(name=None):
+    """설정(TRANSLATION_BACKEND)에 맞는 번역 백엔드 인스턴스 반환"""
+    name = (name or TRANSLATION_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 번역 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+
+    with _backend_lock:
+        if name not in _backend_instances:
+            _backend_instances[name] = BACKENDS[name]()
+            print(f"🔌 번역 백엔드: {name}")
+        return _backend_instances[name]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+번역 메모리 (유사 문장 재사용)
+문자 n-gram MinHash + LSH 인덱스로 후보를 찾고, 편집 유사도로 검증
+정규화 후 같은 문장은 이전 번역을 그대로 재사용하고, 비슷한 문장은 참고 번역으로만 전달 (임계값은 설정으로 조정)
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from config import (
+    TRANSLATION_MEMORY_ENABLED, TRANSLATION_MEMORY_PATH,
+    TRANSLATION_MEMORY_THRESHOLD, TRANSLATION_MEMORY_HINT_THRESHOLD
+)
+
+_PRIME = np.uint64(4294967311)  # 2^32 보다 큰 소수
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_text(text):
+    """비교용 정규화: NFKC, 소문자, 구두점/공백 제거"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    return _NON_WORD.sub('', text)
+
+
+class TranslationMemory:
+    def __init__(self, path=None, ngram=2, num_perm=64, bands=16,
+                 threshold=TRANSLATION_MEMORY_THRESHOLD, hint_threshold=TRANSLATION_MEMORY_HINT_THRESHOLD,
+                 max_candidates=50):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+
+        self.path = path
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.hint_threshold = hint_threshold
+        self.max_candidates = max_candidates
+
+        rng = np.random.RandomState(1)
+        self._a = rng.randint(1, 2 ** 31 - 1, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 31 - 1, size=(num_perm, 1)).astype(np.uint64)
+
+        self._entries = []  # (정규화 원문, 원문, 번역)
+        self._exact = {}    # (언어 키, 정규화 원문) → 엔트리 번호
+        self._buckets = {}  # (언어 키, 밴드 번호, 밴드 해시) → [엔트리 번호]
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    # === 내부 유틸 ===
+    def _shingles(self, normalized):
+        """문자 n-gram 집합 (짧은 문장은 문장 전체를 하나로 사용)"""
+        if len(normalized) <= self.ngram:
+            return {normalized}
+        return {normalized[i:i + self.ngram] for i in range(len(normalized) - self.ngram + 1)}
+
+    def _signature(self, shingles):
+        """MinHash 시그니처 계산 (벡터화)"""
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes[np.newaxis, :] + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, lang_key, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            yield (lang_key, band, hash(chunk.tobytes()))
+
+    @staticmethod
+    def _lang_key(target_lang, source_lang, kind):
+        return (source_lang.lower(), target_lang.lower(), kind)
+
+    def _insert(self, lang_key, source, translation):
+        normalized = normalize_text(source)
+        if not normalized:
+            return
+
+        existing = self._exact.get((lang_key, normalized))
+        if existing is not None:
+            self._entries[existing] = (normalized, source, translation)
+            return
+
+        entry_id = len(self._entries)
+        self._entries.append((normalized, source, translation))
+        self._exact[(lang_key, normalized)] = entry_id
+        for key in self._band_keys(lang_key, self._signature(self._shingles(normalized))):
+            self._buckets.setdefault(key, []).append(entry_id)
+
+    def _load(self, path):
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    lang_key = (record['source_lang'], record['target_lang'], record['kind'])
+                    self._insert(lang_key, record['source'], record['translation'])
+                    count += 1
+                except (ValueError, KeyError):
+                    continue
+        print(f"📚 번역 메모리 로드: {count}개 항목 ({path})")
+
+    # === 공개 API ===
+    def add(self, source, target_lang, translation, source_lang="Korean", kind="subtitle"):
+        """원문 → 번역 쌍 저장"""
+        lang_key = self._lang_key(target_lang, source_lang, kind)
+        with self._lock:
+            self._insert(lang_key, source, translation)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({
+                        'source_lang': lang_key[0], 'target_lang': lang_key[1], 'kind': kind,
+                        'source': source, 'translation': translation
+                    }, ensure_ascii=False) + '\n')
+
+    def lookup(self, source, target_lang, source_lang="Korean", kind="subtitle"):
+        """
+        가장 유사한 저장 번역 검색
+
+        Returns:
+            tuple | None: (번역, 유사도, 저장된 원문) - 유사도가 hint_threshold 미만이면 None
+        """
+        normalized = normalize_text(source)
+        if not normalized:
+            return None
+
+        lang_key = self._lang_key(target_lang, source_lang, kind)
+        with self._lock:
+            entry_id = self._exact.get((lang_key, normalized))
+            if entry_id is not None:
+                _, stored_source, translation = self._entries[entry_id]
+                return translation, 1.0, stored_source
+
+            shingles = self._shingles(normalized)
+            candidates = set()
+            for key in self._band_keys(lang_key, self._signature(shingles)):
+                candidates.update(self._buckets.get(key, ()))
+                if len(candidates) >= self.max_candidates:
+                    break
+
+            # 후보 검증: 짧은 문장에서 조사 하나 차이도 높게 평가되도록 편집 유사도 사용
+            best = None
+            for entry_id in candidates:
+                stored_normalized, stored_source, translation = self._entries[entry_id]
+                similarity = SequenceMatcher(None, normalized, stored_normalized, autojunk=False).ratio()
+                if best is None or similarity > best[1]:
+                    best = (translation, similarity, stored_source)
+
+        if best is None or best[1] < self.hint_threshold:
+            return None
+        return best
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """프로세스 공용 번역 메모리 (비활성화 시 None)"""
+    global _memory
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory(path=TRANSLATION_MEMORY_PATH)
+        return _memory
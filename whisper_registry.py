@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+프로세스 공용 Whisper 모델 레지스트리
+모델 크기별로 한 번만 로드해 요청 간에 공유하고, 유휴 시간 초과나 메모리 부족 시 해제
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from config import WHISPER_MODEL_IDLE_TTL, WHISPER_MIN_FREE_MEMORY_MB
+
+
+class WhisperModelRegistry:
+    def __init__(self, idle_ttl=WHISPER_MODEL_IDLE_TTL, min_free_memory_mb=WHISPER_MIN_FREE_MEMORY_MB,
+                 check_interval=30):
+        self.idle_ttl = idle_ttl
+        self.min_free_memory_mb = min_free_memory_mb
+        self.check_interval = check_interval
+        self._entries = {}     # 모델 크기 → {'model', 'lock', 'last_used', 'in_use'}
+        self._load_locks = {}  # 모델 크기 → 로드 중복 방지 락
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def _load(self, model_size):
+        """모델을 로드해 등록 (이미 있으면 그대로 반환)"""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        with load_lock:
+            entry = self._entries.get(model_size)
+            if entry is not None:
+                return entry
+
+            import whisper
+            print(f"📥 Loading Whisper {model_size} model...")
+            started = time.time()
+            model = whisper.load_model(model_size)
+            print(f"✅ Model {model_size} loaded successfully ({time.time() - started:.1f}s)")
+
+            entry = {'model': model, 'lock': threading.Lock(), 'last_used': time.time(), 'in_use': 0}
+            with self._lock:
+                self._entries[model_size] = entry
+            self._start_reaper()
+            return entry
+
+    @contextmanager
+    def use(self, model_size):
+        """모델을 빌려 사용 (같은 모델의 추론은 한 번에 하나씩 실행)"""
+        while True:
+            entry = self._load(model_size)
+            with self._lock:
+                # 로드 직후 해제된 경우 다시 로드
+                if self._entries.get(model_size) is entry:
+                    entry['in_use'] += 1
+                    break
+
+        try:
+            with entry['lock']:
+                yield entry['model']
+        finally:
+            with self._lock:
+                entry['in_use'] -= 1
+                entry['last_used'] = time.time()
+
+    def warmup(self, model_sizes):
+        """지정된 모델들을 미리 로드"""
+        for model_size in model_sizes:
+            try:
+                self._load(model_size)
+            except Exception as e:
+                print(f"⚠️ Whisper {model_size} 모델 워밍업 실패: {e}")
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._entries)
+
+    def evict(self, model_size):
+        """사용 중이 아닌 모델 해제"""
+        with self._lock:
+            entry = self._entries.get(model_size)
+            if entry is None or entry['in_use'] > 0:
+                return False
+            del self._entries[model_size]
+
+        del entry['model']
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        print(f"🧹 Whisper {model_size} 모델 해제")
+        return True
+
+    def evict_idle(self):
+        """유휴 시간 초과 모델 해제, 메모리가 부족하면 오래 쓰지 않은 모델부터 해제"""
+        now = time.time()
+        with self._lock:
+            idle = sorted(
+                (entry['last_used'], size) for size, entry in self._entries.items() if entry['in_use'] == 0
+            )
+
+        for last_used, model_size in idle:
+            if now - last_used >= self.idle_ttl:
+                self.evict(model_size)
+            elif self._memory_pressure():
+                print("⚠️ Low memory detected, releasing idle Whisper model")
+                self.evict(model_size)
+
+    def _memory_pressure(self):
+        try:
+            import psutil
+        except ImportError:
+            return False
+        return psutil.virtual_memory().available < self.min_free_memory_mb * 1024 * 1024
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True, name="whisper-reaper")
+        self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                print(f"⚠️ Whisper 모델 정리 실패: {e}")
+
+
+model_registry = WhisperModelRegistry()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+임시 파일 없이 응답으로 바로 흘려보내는 ZIP 생성기
+이미 압축된 영상이라 압축 없이(ZIP_STORED) 저장하고, 파일 크기로 전체 길이를 미리 계산해 Content-Length 제공
+CRC는 보내면서 계산하고(데이터 디스크립터) 다음 다운로드부터는 기억해 둔 값을 헤더에 바로 기록
+4GB 이상 파일/아카이브는 ZIP64 형식 사용
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+READ_BLOCK = 1024 * 1024
+ZIP32_LIMIT = 0xFFFFFFFF        # 이 값 이상의 크기/위치는 ZIP64 필드로 기록
+ZIP32_MAX_ENTRIES = 0xFFFF
+ZIP64_MARKER = 0xFFFFFFFF       # ZIP64 필드를 보라는 표시
+ZIP64_MARKER_ENTRIES = 0xFFFF
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+_crc_memo = {}  # (장치, inode, 크기, 수정시각) → CRC32 (하드 링크로 공유된 렌더링 결과도 같은 키)
+_crc_lock = threading.Lock()
+
+
+def _file_key(stat):
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(max(timestamp, 315532800))  # ZIP은 1980년 이전 시각을 표현 못함
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+class _Entry:
+    def __init__(self, path, arcname, offset):
+        stat = os.stat(path)
+        self.path = path
+        self.name = arcname.encode('utf-8')
+        self.size = stat.st_size
+        self.key = _file_key(stat)
+        self.dos_time, self.dos_date = _dos_datetime(stat.st_mtime)
+        self.offset = offset
+        with _crc_lock:
+            self.crc = _crc_memo.get(self.key)
+        self.zip64 = self.size >= ZIP32_LIMIT
+        self.flags = FLAG_UTF8 | (0 if self.crc is not None else FLAG_DATA_DESCRIPTOR)
+
+    @property
+    def version(self):
+        return 45 if self.zip64 or self.offset >= ZIP32_LIMIT else 20
+
+    def local_header(self):
+        if self.crc is not None:
+            crc, size = self.crc, self.size
+        else:
+            crc, size = 0, 0  # 데이터 디스크립터에 기록
+        extra = b''
+        if self.zip64:
+            extra = struct.pack('<HHQQ', 0x0001, 16, size, size)
+            size = ZIP64_MARKER
+        return struct.pack('<IHHHHHIIIHH', 0x04034b50, self.version, self.flags, 0,
+                           self.dos_time, self.dos_date, crc, size, size,
+                           len(self.name), len(extra)) + self.name + extra
+
+    def data_descriptor(self):
+        if not (self.flags & FLAG_DATA_DESCRIPTOR):
+            return b''
+        if self.zip64:
+            return struct.pack('<IIQQ', 0x08074b50, self.crc, self.size, self.size)
+        return struct.pack('<IIII', 0x08074b50, self.crc, self.size, self.size)
+
+    def data_descriptor_length(self):
+        if not (self.flags & FLAG_DATA_DESCRIPTOR):
+            return 0
+        return 24 if self.zip64 else 16
+
+    def central_header(self):
+        fields = []
+        size = self.size
+        offset = self.offset
+        if size >= ZIP32_LIMIT:
+            fields += [size, size]
+            size = ZIP64_MARKER
+        if offset >= ZIP32_LIMIT:
+            fields.append(offset)
+            offset = ZIP64_MARKER
+        extra = struct.pack(f'<HH{len(fields)}Q', 0x0001, 8 * len(fields), *fields) if fields else b''
+        return struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, self.version, self.version, self.flags, 0,
+                           self.dos_time, self.dos_date, self.crc, size, size,
+                           len(self.name), len(extra), 0, 0, 0, 0o644 << 16, offset) + self.name + extra
+
+    def length(self):
+        return len(self.local_header()) + self.size + self.data_descriptor_length()
+
+
+class ZipStream:
+    def __init__(self, files):
+        """files: [(파일 경로, ZIP 내 이름)]"""
+        self.entries = []
+        offset = 0
+        for path, arcname in files:
+            entry = _Entry(path, arcname, offset)
+            self.entries.append(entry)
+            offset += entry.length()
+        self._data_length = offset
+
+    def _central_directory_length(self):
+        length = 0
+        for entry in self.entries:
+            name_and_extra = len(entry.name)
+            overflow = (2 if entry.size >= ZIP32_LIMIT else 0) + (1 if entry.offset >= ZIP32_LIMIT else 0)
+            if overflow:
+                name_and_extra += 4 + 8 * overflow
+            length += 46 + name_and_extra
+        return length
+
+    def _needs_zip64_end(self, cd_size, cd_offset):
+        return len(self.entries) >= ZIP32_MAX_ENTRIES or cd_size >= ZIP32_LIMIT or cd_offset >= ZIP32_LIMIT
+
+    def content_length(self):
+        """전체 ZIP 크기 (바이트)"""
+        cd_size = self._central_directory_length()
+        end_length = 22 + (56 + 20 if self._needs_zip64_end(cd_size, self._data_length) else 0)
+        return self._data_length + cd_size + end_length
+
+    def _end_records(self, cd_size, cd_offset):
+        count = len(self.entries)
+        if not self._needs_zip64_end(cd_size, cd_offset):
+            return struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, cd_size, cd_offset, 0)
+
+        # ZIP64 종료 레코드 + 위치 정보, 기존 종료 레코드는 표시 값으로 채움
+        zip64_end_offset = cd_offset + cd_size
+        return (struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, cd_size, cd_offset)
+                + struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1)
+                + struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, ZIP64_MARKER_ENTRIES, ZIP64_MARKER_ENTRIES,
+                              ZIP64_MARKER, ZIP64_MARKER, 0))
+
+    def __iter__(self):
+        for entry in self.entries:
+            yield entry.local_header()
+
+            crc = 0
+            remaining = entry.size
+            with open(entry.path, 'rb') as f:
+                while remaining > 0:
+                    block = f.read(min(READ_BLOCK, remaining))
+                    if not block:
+                        raise IOError(f"ZIP 전송 중 파일 크기가 바뀜: {entry.path}")
+                    crc = zlib.crc32(block, crc)
+                    remaining -= len(block)
+                    yield block
+
+            if entry.crc is not None and entry.crc != crc:
+                raise IOError(f"ZIP 전송 중 파일 내용이 바뀜: {entry.path}")
+            entry.crc = crc
+            with _crc_lock:
+                _crc_memo[entry.key] = crc
+            yield entry.data_descriptor()
+
+        central_directory = b''.join(entry.central_header() for entry in self.entries)
+        yield central_directory
+        yield self._end_records(len(central_directory), self._data_length)